@@ -0,0 +1,135 @@
+import time
+import queue
+import logging
+import threading
+import multiprocessing
+
+logger = logging.getLogger(__name__)
+
+# Seconds to wait for all account workers to connect to their terminals
+WORKER_STARTUP_TIMEOUT = 120
+
+
+def account_worker(account, signal_queue, result_queue):
+    """
+    Worker process owning terminal connection of a single account. Places an order for every published signal
+    using lot size of the account.
+    args:
+        account: Account configuration including credentials and lot size
+        signal_queue: Queue of signals published for this account, None to stop worker
+        result_queue: Queue order results are reported to
+    """
+    # MetaTrader5 module is bound to a single terminal per process, so it is only imported in worker
+    from mt5_interface import initialize_mt5
+    from order_manager import place_order
+    from signal_guard import Signal
+
+    login = account['credentials']['login']
+    if not initialize_mt5(account['credentials']):
+        result_queue.put(('init_failed', login, None, None))
+        return
+    result_queue.put(('ready', login, None, None))
+    while True:
+        job = signal_queue.get()
+        if job is None:
+            break
+        symbol, signal, order_kwargs, published_time = job
+        try:
+            if isinstance(signal, Signal):
+                # Prices and server time of account's broker may be offset from those signal was computed on,
+                # so only age of signal is checked
+                signal = signal._replace(price=None, bar_time=None)
+            result = place_order(symbol, signal, account['lot_size'], **order_kwargs)
+            retcode = result.retcode if result is not None else None
+        except Exception as ex:
+            logger.error(f"Account {login}: failed to place order for {symbol}: {ex}")
+            retcode = None
+        result_queue.put(('order', login, retcode, time.time() - published_time))
+
+
+class AccountPool:
+    """
+    Pool of per-account worker processes. Signals published by strategy process are submitted by all accounts
+    in parallel, each through its own terminal connection.
+    """
+    def __init__(self, accounts):
+        """
+        args:
+            accounts: List of account configurations, each including credentials and lot_size.
+                      Every account needs its own terminal installation i.e. distinct credentials.mt5_exe_path
+        """
+        self.accounts = accounts
+        self.workers = []
+        self.signal_queues = []
+        self.result_queue = None
+
+    def start(self):
+        """
+        Start worker processes and wait until they are connected to their terminals
+        returns:
+            True if all accounts are connected else False
+        """
+        context = multiprocessing.get_context('spawn')
+        self.result_queue = context.Queue()
+        for account in self.accounts:
+            signal_queue = context.Queue()
+            worker = context.Process(target=account_worker, args=(account, signal_queue, self.result_queue),
+                                     name=f"account-{account['credentials']['login']}", daemon=True)
+            worker.start()
+            self.workers.append(worker)
+            self.signal_queues.append(signal_queue)
+
+        n_ready, n_failed = 0, 0
+        deadline = time.time() + WORKER_STARTUP_TIMEOUT
+        while n_ready + n_failed < len(self.accounts) and time.time() < deadline:
+            try:
+                status, login, _, _ = self.result_queue.get(timeout=1)
+            except queue.Empty:
+                # Workers which died without reporting e.g. due to import errors
+                n_dead = sum(1 for worker in self.workers if not worker.is_alive())
+                if n_dead > n_failed:
+                    logger.error(f"{n_dead - n_failed} account workers exited during startup!!!")
+                    break
+                continue
+            if status == 'ready':
+                n_ready += 1
+                logger.info(f"Account {login}: connected to terminal")
+            else:
+                n_failed += 1
+                logger.error(f"Account {login}: terminal initialization failed!!!")
+        threading.Thread(target=self._report_results, name='account-results', daemon=True).start()
+        return n_ready == len(self.accounts)
+
+    def publish(self, symbol, signal, **order_kwargs):
+        """
+        Publish signal to all accounts. Returns without waiting for orders to be placed
+        args:
+            symbol: Symbol to be traded
+            signal: Signal generated by strategy
+            order_kwargs: Additional order params such as SL/TP margins and comment
+        """
+        published_time = time.time()
+        for signal_queue in self.signal_queues:
+            signal_queue.put((symbol, signal, order_kwargs, published_time))
+        logger.info(f"Published signal: {signal} for symbol: {symbol} to {len(self.signal_queues)} accounts")
+
+    def _report_results(self):
+        while True:
+            status, login, retcode, latency = self.result_queue.get()
+            if status is None:
+                break
+            if status != 'order':
+                logger.warning(f"Account {login}: late worker status: {status}")
+                continue
+            logger.info(f"Account {login}: order result retcode: {retcode}, submitted {latency * 1000:.1f}ms after signal")
+
+    def stop(self):
+        """
+        Stop worker processes
+        """
+        for signal_queue in self.signal_queues:
+            signal_queue.put(None)
+        for worker in self.workers:
+            worker.join(timeout=10)
+        if self.result_queue is not None:
+            self.result_queue.put((None, None, None, None))
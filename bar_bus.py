@@ -0,0 +1,309 @@
+import os
+import sys
+import time
+import logging
+import argparse
+import threading
+from multiprocessing import shared_memory, resource_tracker
+import numpy as np
+from sim_terminal import RATES_DTYPE
+
+logger = logging.getLogger(__name__)
+
+# Bar bus shares bars of a symbol/timeframe fetched once by a feeder process with many strategy processes.
+# Each symbol/timeframe gets a shared memory segment holding a header and a ring of slots. Every publish writes
+# the latest bars into the next slot and then bumps the version counter. Like a seqlock, readers copy bars out
+# of the slot of the version they have read and then check that the writer has not come around to that slot
+# again while they were copying.
+
+# Header fields, stored as int64
+VERSION, N_SLOTS, CAPACITY, LAST_BAR_TIME, PUBLISH_TIME_MS = range(5)
+HEADER_SIZE = 8
+
+# Feeds which were not published for this many seconds are considered stale, e.g. when feeder has died
+STALE_FEED_SECS = 30
+
+# Min and max seconds between attempts to attach to a missing or stale feed
+RETRY_MIN_SECS = 1
+RETRY_MAX_SECS = 60
+
+# Segments created by writers of this process
+own_segments = set()
+
+
+def segment_name(symbol, timeframe):
+    """
+    Shared memory segment name for symbol and timeframe
+    """
+    return f"mt5bars_{symbol}_{timeframe}"
+
+def segment_size(n_slots, capacity):
+    return (HEADER_SIZE + n_slots) * 8 + n_slots * capacity * RATES_DTYPE.itemsize
+
+
+class BarBusSegment:
+    """
+    Views onto shared memory segment of a symbol/timeframe
+    """
+    def __init__(self, shm):
+        self.shm = shm
+        self.header = np.ndarray((HEADER_SIZE,), dtype=np.int64, buffer=shm.buf)
+        n_slots, capacity = int(self.header[N_SLOTS]), int(self.header[CAPACITY])
+        self.slot_counts = np.ndarray((n_slots,), dtype=np.int64, buffer=shm.buf, offset=HEADER_SIZE * 8)
+        self.slots = np.ndarray((n_slots, capacity), dtype=RATES_DTYPE, buffer=shm.buf, offset=(HEADER_SIZE + n_slots) * 8)
+
+    def close(self):
+        # Views need to be released before shared memory can be closed
+        self.header = self.slot_counts = self.slots = None
+        self.shm.close()
+
+
+class BarBusWriter(BarBusSegment):
+    """
+    Publishes bars of a symbol/timeframe. Only a single writer per symbol/timeframe is supported
+    """
+    def __init__(self, symbol, timeframe, capacity=500, n_slots=4):
+        """
+        args:
+            symbol: Symbol under consideration
+            timeframe: Timeframe in meta trader format
+            capacity: Max no. of bars published at once
+            n_slots: No. of slots in ring, readers may use bars of a version until n_slots - 2 newer versions are published
+        """
+        name = segment_name(symbol, timeframe)
+        try:
+            shm = shared_memory.SharedMemory(name=name, create=True, size=segment_size(n_slots, capacity))
+            header = np.ndarray((HEADER_SIZE,), dtype=np.int64, buffer=shm.buf)
+            header[:] = 0
+            header[N_SLOTS] = n_slots
+            header[CAPACITY] = capacity
+            del header
+        except FileExistsError:
+            # Left over by a feeder which was restarted. Segment is reused along with its layout and version
+            # counter, since it can't be unlinked on Windows while readers are attached to it
+            shm = shared_memory.SharedMemory(name=name)
+            logger.info(f"Reusing bar bus segment: {name}")
+        super().__init__(shm)
+        if self.slots.shape != (n_slots, capacity):
+            logger.warning(f"Bar bus segment {name} has {self.slots.shape[0]} slots of {self.slots.shape[1]} bars, "
+                           f"publishing up to {self.slots.shape[1]} bars")
+        own_segments.add(name)
+        self.last_row = None
+
+    def publish(self, rates):
+        """
+        Publish latest bars if they have changed since last publish. Publish time is updated either way, so
+        that feed stays live while bars don't change e.g. in quiet markets or closed sessions
+        args:
+            rates: Rates array as returned by copy_rates_from_pos, ordered from oldest to newest
+        returns:
+            True if bars were published else False
+        """
+        if rates is None or len(rates) == 0:
+            return False
+        rates = rates[-self.slots.shape[1]:]
+        last_row = rates[-1].tobytes() + rates[0].tobytes()
+        if last_row == self.last_row:
+            self.header[PUBLISH_TIME_MS] = int(time.time() * 1000)
+            return False
+        version = int(self.header[VERSION]) + 1
+        slot = version % self.slots.shape[0]
+        self.slots[slot, :len(rates)] = rates.astype(RATES_DTYPE, copy=False)
+        self.slot_counts[slot] = len(rates)
+        self.header[LAST_BAR_TIME] = int(rates['time'][-1])
+        self.header[PUBLISH_TIME_MS] = int(time.time() * 1000)
+        # Version is bumped only once slot has been written
+        self.header[VERSION] = version
+        self.last_row = last_row
+        return True
+
+    def close(self):
+        super().close()
+        self.shm.unlink()
+        own_segments.discard(self.shm.name)
+
+
+class BarBusReader(BarBusSegment):
+    """
+    Zero-copy access to bars of a symbol/timeframe published by feeder process
+    """
+    def __init__(self, symbol, timeframe):
+        """
+        raises:
+            FileNotFoundError: If no feeder is publishing symbol/timeframe
+        """
+        name = segment_name(symbol, timeframe)
+        shm = shared_memory.SharedMemory(name=name)
+        if os.name == 'posix' and name not in own_segments:
+            # Segment is owned by feeder, readers must not unlink it when they exit
+            resource_tracker.unregister(shm._name, 'shared_memory')
+        super().__init__(shm)
+
+    def version(self):
+        return int(self.header[VERSION])
+
+    def last_bar_time(self):
+        return int(self.header[LAST_BAR_TIME])
+
+    def is_stale(self):
+        return time.time() * 1000 - int(self.header[PUBLISH_TIME_MS]) > STALE_FEED_SECS * 1000
+
+    def read(self):
+        """
+        Latest published bars. Bars need to be copied and checked using is_valid before they are used
+        returns:
+            version: Version of bars, 0 if nothing has been published yet
+            rates: Read only view of bars in shared memory or None
+        """
+        version = self.version()
+        if version == 0:
+            return 0, None
+        slot = version % self.slots.shape[0]
+        rates = self.slots[slot, :self.slot_counts[slot]]
+        rates.flags.writeable = False
+        return version, rates
+
+    def is_valid(self, version):
+        """
+        Check whether bars of given version have not been overwritten by writer
+        """
+        return self.version() - version < self.slots.shape[0] - 1
+
+
+class BarBusTerminal:
+    """
+    Terminal wrapper serving copy_rates_from_pos from bar bus, falling back to terminal for symbols/timeframes
+    which are not published or whose feed is stale. Install it using terminal.use_terminal
+    """
+    def __init__(self, terminal, poll_interval=0.01):
+        """
+        args:
+            terminal: Terminal used for all other calls and as fallback
+            poll_interval: Seconds between checks for new bars while waiting
+        """
+        self._terminal = terminal
+        self._poll_interval = poll_interval
+        # Readers are shared by strategy loop and exit manager thread
+        self._lock = threading.Lock()
+        self._readers = {}
+        # Time of next attach attempt and current backoff per symbol/timeframe without a live feed
+        self._retries = {}
+
+    def __getattr__(self, name):
+        return getattr(self._terminal, name)
+
+    def _reader(self, symbol, timeframe):
+        """
+        Reader of a live feed for symbol/timeframe or None. Missing and stale feeds are attached to again with
+        backoff, so bots pick up feeders which are started or restarted after them
+        """
+        key = (symbol, timeframe)
+        reader = self._readers.get(key)
+        if reader is not None and not reader.is_stale():
+            return reader
+        retry_time, delay = self._retries.get(key, (0.0, 0))
+        if time.time() < retry_time:
+            return None
+        if reader is not None:
+            logger.warning(f"Bar bus feed for symbol: {symbol}, timeframe: {timeframe} is stale. Fetching bars from terminal")
+            reader.close()
+            self._readers[key] = None
+        try:
+            reader = BarBusReader(symbol, timeframe)
+        except FileNotFoundError:
+            reader = None
+        if reader is not None and not reader.is_stale():
+            self._readers[key] = reader
+            self._retries.pop(key, None)
+            logger.info(f"Reading bars for symbol: {symbol}, timeframe: {timeframe} from bar bus")
+            return reader
+        if reader is not None:
+            reader.close()
+        if key not in self._retries:
+            logger.warning(f"No live bar bus feed for symbol: {symbol}, timeframe: {timeframe}. Fetching bars from terminal")
+        delay = min(max(delay * 2, RETRY_MIN_SECS), RETRY_MAX_SECS)
+        self._retries[key] = (time.time() + delay, delay)
+        return None
+
+    def copy_rates_from_pos(self, symbol, timeframe, start_pos, count):
+        with self._lock:
+            reader = self._reader(symbol, timeframe)
+            if reader is not None:
+                version, rates = reader.read()
+                if rates is not None and len(rates) >= start_pos + count:
+                    rates = np.array(rates[len(rates) - start_pos - count:len(rates) - start_pos])
+                    # Bars are only used if writer has not started overwriting their slot while they were copied
+                    if reader.is_valid(version):
+                        return rates
+        return self._terminal.copy_rates_from_pos(symbol, timeframe, start_pos, count)
+
+    def wait_for_new_bar(self, timeout):
+        """
+        Wait until a new bar is published for any symbol/timeframe read so far
+        args:
+            timeout: Max no. of seconds to wait
+        returns:
+            True if a new bar was published else False
+        """
+        with self._lock:
+            last_bar_times = {key: reader.last_bar_time() for key, reader in self._readers.items() if reader is not None}
+        if not last_bar_times:
+            time.sleep(timeout)
+            return False
+        deadline = time.perf_counter() + timeout
+        while time.perf_counter() < deadline:
+            time.sleep(min(self._poll_interval, max(deadline - time.perf_counter(), 0)))
+            with self._lock:
+                # Readers replaced or dropped meanwhile are skipped
+                if any(self._readers.get(key) is not None and self._readers[key].last_bar_time() != last_bar_time
+                       for key, last_bar_time in last_bar_times.items()):
+                    return True
+        return False
+
+
+def run_feeder(feeds, n_bars, interval):
+    """
+    Fetch bars once per symbol/timeframe and publish them to bar bus
+    args:
+        feeds: List of symbol, timeframe tuples
+        n_bars: No. of latest bars to publish
+        interval: Seconds between two fetches
+    """
+    import MetaTrader5 as mt5
+
+    writers = {feed: BarBusWriter(feed[0], feed[1], capacity=n_bars) for feed in feeds}
+    logger.info(f"Publishing {n_bars} bars for {list(writers)} every {interval}s")
+    try:
+        while True:
+            for (symbol, timeframe), writer in writers.items():
+                rates = mt5.copy_rates_from_pos(symbol, timeframe, 0, n_bars)
+                if rates is None:
+                    logger.warning(f"Got no rates for symbol: {symbol}, timeframe: {timeframe}: {mt5.last_error()}")
+                    continue
+                writer.publish(rates)
+            time.sleep(interval)
+    finally:
+        for writer in writers.values():
+            writer.close()
+
+
+if __name__ == "__main__":
+    from utils import read_config, parse_trade_timeframe
+    from mt5_interface import initialize_mt5
+
+    logging.basicConfig(level=logging.INFO, format='[%(asctime)s] %(levelname)s - %(message)s', datefmt='%H:%M:%S')
+    parser = argparse.ArgumentParser(description='Publish bars for strategies of given configuration files to bar bus')
+    parser.add_argument('config_files', nargs='+', help='Configuration files of strategy processes')
+    parser.add_argument('--bars', type=int, default=500, help='No. of latest bars published per symbol/timeframe')
+    parser.add_argument('--interval', type=float, default=1.0, help='Seconds between two fetches')
+    args = parser.parse_args()
+
+    configs = [read_config(config_file) for config_file in args.config_files]
+    feeds = sorted({(config['trade_params']['symbol'], parse_trade_timeframe(config['trade_params']['timeframe'])) for config in configs})
+    if not initialize_mt5(configs[0]['credentials']):
+        logger.error("Initialization failed!!!")
+        sys.exit(0)
+    try:
+        run_feeder(feeds, args.bars, args.interval)
+    except KeyboardInterrupt:
+        logger.info("Stopping bar bus feeder")
@@ -1,17 +1,28 @@
+import time
+# Taken before any other import so that startup report includes import time
+process_start_time = time.perf_counter()
+import sys
+if __name__ == "__main__" and any(arg == '--simulate' or arg.startswith('--simulate=') for arg in sys.argv[1:]):
+    # Simulations don't need MetaTrader5 package, which is only available on Windows. Stand-in terminal is installed
+    # before bot modules import it and replaced by one running on virtual clock once arguments are parsed
+    from sim_terminal import SimTerminal
+    from terminal import use_terminal
+    use_terminal(SimTerminal())
 import MetaTrader5 as mt5
-from strategy import RSI_strategy_mean, ADX_RSI_strategy, DXI_strategy, Aroon_strategy, Aroon_custom_threshold_based_exit_strategy, Aroon_strategy_custom_threshold_close_orders
-from utils import read_config, parse_config, parse_trade_timeframe
-from mt5_interface import initialize_mt5
+from utils import read_config, parse_config, parse_trade_timeframe, validate_config
+from config_watcher import ConfigWatcher
+from terminal import use_terminal
+from clock import get_clock, set_clock, VirtualClock, SimulationFinished, JournalExhausted
+from mt5_interface import initialize_mt5, set_trade_database
 from order_manager import place_order, place_order_without_sltp
-from time import sleep
-import sys
+from signal_guard import order_type_of
+import importlib
 import logging
-from datetime import datetime
 import os
 import argparse
 
 os.makedirs("logs", exist_ok=True)
-curr_dt = datetime.now().strftime(f"%Y_%m_%d")
+curr_dt = get_clock().now().strftime(f"%Y_%m_%d")
 logging.basicConfig(
      filename=f'logs/trading_bot_{curr_dt}.log',
      level=logging.INFO, 
@@ -29,31 +40,128 @@ console.setFormatter(formatter)
 # add the handler to the root logger
 logging.getLogger(__name__).addHandler(console)
 logger = logging.getLogger(__name__)
+
+# Iteration profiler, only set when bot is running with --profile
+profiler = None
+
+# Bar bus terminal, only set when bot is running with --bar-bus
+bar_bus = None
+
+# Monitor of simulated run, only set when bot is running with --simulate
+simulation_monitor = None
+
+# Mark-to-market of open positions of this terminal, not set when recording or replaying a journal
+exposure_tracker = None
+
+# Worker processes of accounts signals are fanned out to, only set when configuration has accounts
+account_pool = None
+
+# Modules needed by each strategy besides bot modules. Only modules of selected strategy are loaded, before
+# connecting to terminal so that missing ones fail fast
+STRATEGY_MODULES = {
+    'RSI': ('strategy', 'talib'),
+    'ADX_RSI_DI': ('strategy', 'talib'),
+    'DXI': ('strategy', 'talib'),
+    'AROON': ('strategy',),
+    'AROON_CUSTOM_ENTRY_EXIT': ('strategy',),
+}
+
+# No. of bars fetched once before first iteration so that terminal has history of symbol loaded
+WARMUP_BARS = 100
     
 
-def rsi_strategy(trade_params, strategy_params, timeframe):
+def reload_params(config_watcher, trade_params, strategy_params):
+    """
+    Swap in latest validated configuration params between loop iterations
+    args:
+        config_watcher: Config watcher for running bot or None if hot reload is disabled
+        trade_params: Trading params used by previous iteration
+        strategy_params: Strategy params used by previous iteration
+    return:
+        trade_params: Trading params for next iteration
+        strategy_params: Strategy params for next iteration
+    """
+    if config_watcher is None:
+        return trade_params, strategy_params
+    return config_watcher.poll()
+
+def end_iteration(sleep_interval):
+    """
+    Finish current loop iteration and wait for sleep interval before next one
+    args:
+        sleep_interval: No. of seconds to wait
+    return: None
+    """
+    if profiler is not None:
+        profiler.end_iteration()
+    if simulation_monitor is not None:
+        simulation_monitor.end_iteration(sleep_interval)
+    if bar_bus is not None:
+        # Start next iteration right away when feeder publishes a new bar
+        bar_bus.wait_for_new_bar(sleep_interval)
+    else:
+        get_clock().sleep(sleep_interval)
+    if profiler is not None:
+        profiler.begin_iteration()
+    if simulation_monitor is not None:
+        simulation_monitor.begin_iteration()
+
+def submit_order(trade_params, signal, **order_kwargs):
+    """
+    Place order for signal using trading params of running strategy
+    args:
+        trade_params: Trading params
+        signal: Signal generated by strategy
+        order_kwargs: Additional order params such as SL/TP margins and comment
+    return: None
+    """
+    signal_deadline = trade_params.get('signal_deadline_secs')
+    max_deviation_pips = trade_params.get('max_price_deviation_pips')
+    if account_pool is not None:
+        # Accounts place orders using their own lot size
+        account_pool.publish(trade_params['symbol'], signal, signal_deadline=signal_deadline,
+                             max_deviation_pips=max_deviation_pips, **order_kwargs)
+        return
+    max_exposure = trade_params.get('max_currency_exposure')
+    if signal is not None and max_exposure and exposure_tracker is not None:
+        # Tracker is reconciled with open positions of terminal in background, so check only reads it
+        if exposure_tracker.has_symbol(trade_params['symbol']):
+            direction = 1 if order_type_of(signal) == mt5.ORDER_TYPE_BUY else -1
+            if not exposure_tracker.check_order(trade_params['symbol'], direction, trade_params['lot_size'], max_exposure):
+                return
+    place_order(trade_params['symbol'], signal, trade_params['lot_size'], signal_deadline=signal_deadline,
+                max_deviation_pips=max_deviation_pips, **order_kwargs)
+
+def rsi_strategy(trade_params, strategy_params, timeframe, config_watcher=None):
     """ 
     RSI trading strategy
     args:
-        symbol: Currency to be traded
+        trade_params: Trading params
+        strategy_params: Strategy params
         timeframe: Timeframe under consideration
-        strategy_params: Strategy params        
+        config_watcher: Config watcher used to reload params while running
     return: None
     """ 
-    # Trading params   
-    symbol = trade_params['symbol']
-    lot_size = trade_params['lot_size']
-    sleep_interval = trade_params['sleep_interval']
-
-    # Strategy params
-    rsi_params = strategy_params['RSI']
-    rsi_period = rsi_params['rsi_period']
-    rsi_lower_threshold = rsi_params['rsi_lower_thresh']
-    rsi_upper_threshold = rsi_params['rsi_upper_thresh']
+    from strategy import RSI_strategy_mean
 
     prev_rsi_val = None
+    rsi_period = None
     # Enter the main trading loop
     while True:
+        trade_params, strategy_params = reload_params(config_watcher, trade_params, strategy_params)
+        # Trading params   
+        symbol = trade_params['symbol']
+        sleep_interval = trade_params['sleep_interval']
+
+        # Strategy params
+        rsi_params = strategy_params['RSI']
+        # Previous RSI value is only comparable when computed using same RSI period
+        if rsi_params['rsi_period'] != rsi_period:
+            prev_rsi_val = None
+        rsi_period = rsi_params['rsi_period']
+        rsi_lower_threshold = rsi_params['rsi_lower_thresh']
+        rsi_upper_threshold = rsi_params['rsi_upper_thresh']
+
         # Check for a trading signal
         prev_rsi_val, signal = RSI_strategy_mean(symbol, timeframe, rsi_period, rsi_upper_threshold, rsi_lower_threshold, prev_rsi_val)
 
@@ -62,134 +170,161 @@ def rsi_strategy(trade_params, strategy_params, timeframe):
         logger.info(f"RSI value: {prev_rsi_val}")
         # Execute the trade if there is a signal
         if signal is not None:        
-            place_order(symbol, signal, lot_size)
+            submit_order(trade_params, signal)
 
         # Wait for 1 minute before checking for another trading signal
-        sleep(sleep_interval)
+        end_iteration(sleep_interval)
         logger.debug(f"Waiting for {sleep_interval}s prior to checking")
    
-def adx_rsi_strategy(trade_params, strategy_params, timeframe):
+def adx_rsi_strategy(trade_params, strategy_params, timeframe, config_watcher=None):
     """
     ADX RSI strategy
     args:
         trade_params: Trading params
         strategy_params: Strategy params
         timeframe: mt5 timeframe
+        config_watcher: Config watcher used to reload params while running
     """
-    # Trading params   
-    symbol = trade_params['symbol']
-    lot_size = trade_params['lot_size']
-    sleep_interval = trade_params['sleep_interval']
-
-    # Strategy params
-    rsi_params = strategy_params['ADX_RSI_DI']
-    rsi_period = rsi_params['rsi_period']
-    rsi_lower_threshold = rsi_params['rsi_lower_thresh']
-    rsi_upper_threshold = rsi_params['rsi_upper_thresh']
+    from strategy import ADX_RSI_strategy
+
     prev_rsi_val = None
+    rsi_period = None
 
     # Enter the main trading loop
     while True:
+        trade_params, strategy_params = reload_params(config_watcher, trade_params, strategy_params)
+        # Trading params   
+        symbol = trade_params['symbol']
+        sleep_interval = trade_params['sleep_interval']
+
+        # Strategy params
+        rsi_params = strategy_params['ADX_RSI_DI']
+        # Previous RSI value is only comparable when computed using same RSI period
+        if rsi_params['rsi_period'] != rsi_period:
+            prev_rsi_val = None
+        rsi_period = rsi_params['rsi_period']
+        rsi_lower_threshold = rsi_params['rsi_lower_thresh']
+        rsi_upper_threshold = rsi_params['rsi_upper_thresh']
+
         # Check for a trading signal                                                
         prev_rsi_val, signal = ADX_RSI_strategy(symbol, timeframe, rsi_period, rsi_upper_threshold, rsi_lower_threshold, prev_rsi_val)
         # use RSI mean strategy to generate trading signal       
         logger.info(f"RSI value: {prev_rsi_val}")
         # Execute the trade if there is a signal
         if signal is not None:
-            place_order(symbol, signal, lot_size)
+            submit_order(trade_params, signal)
 
         # Wait for 1 minute before checking for another trading signal
-        sleep(sleep_interval)
+        end_iteration(sleep_interval)
         logger.debug(f"Waiting for {sleep_interval}s prior to checking")
 
-def dxi_strategy(trade_params, timeframe):
+def dxi_strategy(trade_params, strategy_params, timeframe, config_watcher=None):
     """
     DXI Strategy
     args:
         trade_params: Trading params
+        strategy_params: Strategy params
         timeframe: Timeframe for trading
+        config_watcher: Config watcher used to reload params while running
     """
-    symbol = trade_params['symbol']
-    lot_size = trade_params['lot_size']
-    stop_loss_pips = trade_params['stop_loss_pips_margin']
-    take_profit_pips = trade_params['take_profit_pips_margin']
-    sleep_interval = trade_params['sleep_interval']
+    from strategy import DXI_strategy
+
     prev_pos_di_val = None
     prev_neg_di_val = None
 
     while True:
+        trade_params, strategy_params = reload_params(config_watcher, trade_params, strategy_params)
+        symbol = trade_params['symbol']
+        stop_loss_pips = trade_params['stop_loss_pips_margin']
+        take_profit_pips = trade_params['take_profit_pips_margin']
+        sleep_interval = trade_params['sleep_interval']
+
         prev_pos_di_val, prev_neg_di_val, signal = DXI_strategy(symbol, timeframe, prev_pos_di_val, prev_neg_di_val)
         if signal is not None:            
             # cancel order
             # cancel_orders()
             logger.info(f"Found crossover for pos di val and neg di val!!. executing signal: {signal}")
-            place_order(symbol, signal, lot_size, SL_MARGIN=stop_loss_pips, TP_MARGIN=take_profit_pips, comment='DXI trading bot')
+            submit_order(trade_params, signal, SL_MARGIN=stop_loss_pips, TP_MARGIN=take_profit_pips, comment='DXI trading bot')
         
         # Wait for sleep interval before checking again to generate trading signal
-        sleep(sleep_interval)
+        end_iteration(sleep_interval)
         logger.debug(f"Waiting for {sleep_interval}s prior to checking again!!")
 
 
-def aroon_strategy(trade_params, timeframe):
+def aroon_strategy(trade_params, strategy_params, timeframe, config_watcher=None):
     """
     Aroon Strategy
     args:
         trade_params: Trade parameters
+        strategy_params: Strategy params
         timeframe: Timeframe
+        config_watcher: Config watcher used to reload params while running
     return:
         None
     """
+    from strategy import Aroon_strategy
+
     prev_ar_up_val = None
     prev_ar_down_val = None
-    symbol = trade_params['strategy']
-    lot_size = trade_params['lot_size']
-    sleep_interval = trade_params['sleep_interval']
-    stop_loss_pips = trade_params['stop_loss_pips_margin']
-    take_profit_pips = trade_params['take_profit_pips_margin']
 
     while True:
+        trade_params, strategy_params = reload_params(config_watcher, trade_params, strategy_params)
+        symbol = trade_params['symbol']
+        sleep_interval = trade_params['sleep_interval']
+        stop_loss_pips = trade_params['stop_loss_pips_margin']
+        take_profit_pips = trade_params['take_profit_pips_margin']
+
         prev_ar_up_val, prev_ar_down_val, signal = Aroon_strategy(symbol, timeframe, prev_ar_up_val, prev_ar_down_val)
         if signal is not None:            
             logger.info(f"Found crossover for AR up val and AR down val!!. executing signal: {signal}")
-            place_order(symbol, signal, lot_size, SL_MARGIN=stop_loss_pips, TP_MARGIN=take_profit_pips, comment='AR trading bot')
+            submit_order(trade_params, signal, SL_MARGIN=stop_loss_pips, TP_MARGIN=take_profit_pips, comment='AR trading bot')
         
         # Wait for sleep interval before checking again to generate trading signal
-        sleep(sleep_interval)
+        end_iteration(sleep_interval)
         logger.debug(f"Waiting for {sleep_interval}s prior to checking again!!")
 
-def aroon_strategy_with_custom_threshold(trade_params, timeframe):
+def aroon_strategy_with_custom_threshold(trade_params, strategy_params, timeframe, config_watcher=None):
     """
     Aroon strategy with custom threshold
     args:
-        symbol: Symbol under consideration
+        trade_params: Trade parameters
+        strategy_params: Strategy params including custom entry and exit thresholds
         timeframe: Timeframe for candlesticks
-        lot_size: Lot size for order
-        sleep_interval: No. of seconds to wait before re-checking for any possible signal possibility
+        config_watcher: Config watcher used to reload params while running
     """
+    from strategy import Aroon_custom_threshold_based_exit_strategy
+
+    # Thresholds are only applied on computed Aroon values so indicator state is kept across reloads
     prev_ar_up_val = None
     prev_ar_down_val = None
-    symbol = trade_params['symbol']
-    lot_size = trade_params['lot_size']
-    sleep_interval = trade_params['sleep_interval']
-    sl_margin = trade_params['stop_loss_pips_margin']
-    tp_margin = trade_params['take_profit_pips_margin']
 
     while True:
+        trade_params, strategy_params = reload_params(config_watcher, trade_params, strategy_params)
+        symbol = trade_params['symbol']
+        sleep_interval = trade_params['sleep_interval']
+        sl_margin = trade_params['stop_loss_pips_margin']
+        tp_margin = trade_params['take_profit_pips_margin']
+        aroon_params = strategy_params['AROON_CUSTOM_ENTRY_EXIT']
+
         # Check thresholds and close orders
         #Aroon_strategy_custom_threshold_close_orders(symbol=symbol, timeframe=timeframe)
 
         # Place orders using Aroon strategy
-        prev_ar_up_val, prev_ar_down_val, signal = Aroon_custom_threshold_based_exit_strategy(symbol, timeframe, prev_ar_up_val, prev_ar_down_val)
+        prev_ar_up_val, prev_ar_down_val, signal = Aroon_custom_threshold_based_exit_strategy(symbol, timeframe, prev_ar_up_val, prev_ar_down_val,
+                                                                                              up_line_buy_lower_thresh=aroon_params['up_line_buy_lower_thresh'],
+                                                                                              up_line_buy_upper_thresh=aroon_params['up_line_buy_upper_thresh'],
+                                                                                              down_line_sell_upper_thresh=aroon_params['down_line_sell_upper_thresh'],
+                                                                                              down_line_sell_lower_thresh=aroon_params['down_line_sell_lower_thresh'])
         if signal is not None:            
             logger.info(f"Found crossover for AR up val and AR down val!!. executing signal: {signal}")
-            place_order(symbol, signal, lot_size, SL_MARGIN=sl_margin, TP_MARGIN=tp_margin, comment='AR custom trading bot')
+            submit_order(trade_params, signal, SL_MARGIN=sl_margin, TP_MARGIN=tp_margin, comment='AR custom trading bot')
             #place_order_without_sltp(symbol, signal, lot_size, comment='AR custom trading bot')
         
         # Wait for sleep interval before checking again to generate trading signal
-        sleep(sleep_interval)
+        end_iteration(sleep_interval)
         logger.debug(f"Waiting for {sleep_interval}s prior to checking again!!")
 
-def main(strategy_name, timeframe, trade_params, strategy_params):
+def main(strategy_name, timeframe, trade_params, strategy_params, config_watcher=None):
     """ 
     Main function
     args:
@@ -197,6 +332,7 @@ def main(strategy_name, timeframe, trade_params, strategy_params):
         timeframe: Timeframe
         trade_params: Trade params
         strategy_params: Strategy params
+        config_watcher: Config watcher used to reload params while running or None
     return: None
     """
     strategy_name = trade_params['strategy']
@@ -205,37 +341,213 @@ def main(strategy_name, timeframe, trade_params, strategy_params):
     try:    
         if strategy_name == 'RSI':
             logger.info(f"Running RSI trading strategy for symbol: {symbol}, timeframe: {timeframe}")
-            rsi_strategy(trade_params, timeframe)
+            rsi_strategy(trade_params, strategy_params, timeframe, config_watcher)
         elif strategy_name == 'ADX_RSI_DI':
             logger.info(f"Running ADX_RSI_DI trading strategy for symbol: {symbol}, timeframe: {timeframe}")
-            adx_rsi_strategy(trade_params, timeframe)
+            adx_rsi_strategy(trade_params, strategy_params, timeframe, config_watcher)
         elif strategy_name == 'DXI':
             logger.info(f"Running DXI trading strategy for symbol: {symbol}, timeframe: {timeframe}")
-            dxi_strategy(trade_params, timeframe)
+            dxi_strategy(trade_params, strategy_params, timeframe, config_watcher)
         elif strategy_name == "AROON":
             logger.info(f"Running Aroon strategy for symbol: {symbol}, timeframe: {timeframe}")
-            aroon_strategy(trade_params, timeframe)
+            aroon_strategy(trade_params, strategy_params, timeframe, config_watcher)
         elif strategy_name == "AROON_CUSTOM_ENTRY_EXIT":
             logger.info(f"Running Arooon with custom thresholds strategy for symbol: {symbol}, timeframe: {timeframe} with custom entry and exit thresholds")
-            aroon_strategy_with_custom_threshold(trade_params, timeframe)
+            aroon_strategy_with_custom_threshold(trade_params, strategy_params, timeframe, config_watcher)
     except Exception as ex:
         logger.error(f"Got Error while runnning bot: {ex}")
         logger.error(ex, exc_info=True)
         logger.error("Terminating bot!!!")
 
-if __name__ == "__main__":
+def parse_args(argv=None):
+    """
+    Parse and check command line arguments of bot
+    args:
+        argv: Arguments, defaults to those of process
+    return:
+        Parsed arguments
+    """
     parser = argparse.ArgumentParser(description='parse arguments')
     parser.add_argument('config_file', help='Configuration file to be utilized for processing')
-    args = parser.parse_args()
+    parser.add_argument('--no-reload', action='store_true', help='Disable reloading of configuration file while bot is running')
+    journal_group = parser.add_mutually_exclusive_group()
+    journal_group.add_argument('--record', metavar='JOURNAL', help='Record terminal calls and responses to journal file')
+    journal_group.add_argument('--replay', metavar='JOURNAL', help='Replay terminal responses from journal file as fast as possible')
+    journal_group.add_argument('--simulate', metavar='DAYS', type=float, help='Run loops on a virtual clock against stand-in terminal for given no. of simulated days')
+    parser.add_argument('--simulate-report-every', type=float, default=3600, help='Simulated seconds between simulation summaries')
+    parser.add_argument('--bar-bus', action='store_true', help='Read bars published by bar_bus.py feeder instead of polling terminal')
+    parser.add_argument('--exit-manager', action='store_true', help='Evaluate exit rules for all open positions of the bot on every bar close. Enable it for a single bot only')
+    parser.add_argument('--trade-db', metavar='DB_FILE', help='Record orders, deals and open positions to local SQLite trade database')
+    parser.add_argument('--profile', action='store_true', help='Profile strategy loop iterations')
+    parser.add_argument('--profile-every', type=int, default=100, help='No. of iterations between profile summaries')
+    parser.add_argument('--profile-duration', type=float, help='Stop profiling after given no. of seconds')
+    parser.add_argument('--startup-only', action='store_true', help='Exit after startup and its timing report, e.g. to check startup time')
+    args = parser.parse_args(argv)
+    if args.replay and args.trade_db:
+        # Syncing trades from another thread would consume replayed responses out of order
+        parser.error("--trade-db can not be used with --replay")
+    if (args.simulate or args.record or args.replay) and args.bar_bus:
+        # Bars read from bus bypass journal and stand-in terminal
+        parser.error("--bar-bus can not be used with --simulate, --record or --replay")
+    if (args.record or args.replay) and args.exit_manager:
+        # Calls of exit manager thread would interleave nondeterministically with those of strategy loop in journal
+        parser.error("--exit-manager can not be used with --record or --replay")
+    return args
+
+def start_account_pool(config_data, args):
+    """
+    Start worker processes of accounts signals are fanned out to
+    args:
+        config_data: Configuration data
+        args: Parsed arguments
+    return:
+        Started account pool or None if signals are not fanned out
+    """
+    if not config_data.get('accounts') or args.startup_only:
+        return None
+    if args.simulate:
+        logger.warning("Accounts are not used in simulation, orders are only placed on stand-in terminal")
+        return None
+    if args.replay:
+        # Replayed signals would otherwise become live orders on every account
+        logger.warning("Accounts are not used when replaying a journal")
+        return None
+    from account_pool import AccountPool
+    logger.info(f"Fanning out signals to {len(config_data['accounts'])} accounts")
+    pool = AccountPool(config_data['accounts'])
+    if not pool.start():
+        logger.error("Account initialization failed!!!")
+        pool.stop()
+        sys.exit(0)
+    return pool
+
+if __name__ == "__main__":
+    args = parse_args()
+    startup_times = {'imports': time.perf_counter() - process_start_time}
     print(f"Currently running trading bot using {args.config_file} configuration file")
+
+    # Configuration is validated before anything is loaded or connected
+    phase_start_time = time.perf_counter()
     config_data = read_config(args.config_file)
+    try:
+        validate_config(config_data)
+    except ValueError as ex:
+        logger.error(f"Invalid configuration file {args.config_file}: {ex}")
+        sys.exit(1)
     credentials, trade_params, strategy_params = parse_config(config_data)
     trade_timeframe = parse_trade_timeframe(trade_params['timeframe'])
+    if args.record and trade_params.get('max_currency_exposure'):
+        # Journals are recorded without exposure tracker, since replay can't skip the orders it would skip
+        logger.error(f"Invalid configuration file {args.config_file}: max_currency_exposure can not be used with --record")
+        sys.exit(1)
+    strategy_name = trade_params['strategy']
+    startup_times['config'] = time.perf_counter() - phase_start_time
+
+    phase_start_time = time.perf_counter()
+    for module_name in STRATEGY_MODULES[strategy_name]:
+        importlib.import_module(module_name)
+    startup_times['strategy modules'] = time.perf_counter() - phase_start_time
+
+    phase_start_time = time.perf_counter()
+    if args.replay:
+        from journal import ReplayTerminal
+        logger.info(f"Replaying terminal calls from journal: {args.replay}")
+        use_terminal(ReplayTerminal(args.replay, constants=mt5))
+        # Recorded responses are served without waiting for next iteration
+        set_clock(VirtualClock(get_clock().time()))
+    elif args.simulate:
+        from sim_terminal import SimTerminal
+        start_time = get_clock().time()
+        logger.info(f"Simulating {args.simulate} days against stand-in terminal")
+        set_clock(VirtualClock(start_time, end_time=start_time + args.simulate * 24 * 60 * 60))
+        use_terminal(SimTerminal(time_fn=get_clock().time))
+    if not (args.record or args.replay):
+        from exposure import ExposureTracker, ExposureTerminal
+        exposure_tracker = ExposureTracker()
+        exposure_terminal = ExposureTerminal(mt5, exposure_tracker)
+        use_terminal(exposure_terminal)
+    if args.record:
+        from journal import RecordingTerminal
+        logger.info(f"Recording terminal calls to journal: {args.record}")
+        use_terminal(RecordingTerminal(mt5, args.record))
     init_status = initialize_mt5(config_data['credentials'])
     if not init_status:
         logger.error("Initialization failed!!!")
         sys.exit(0)
     else:
         logger.info("Initialization successful!!")
-    strategy_name = trade_params['strategy']
-    main(strategy_name, trade_timeframe, trade_params, strategy_params)
\ No newline at end of file
+    startup_times['connect'] = time.perf_counter() - phase_start_time
+
+    phase_start_time = time.perf_counter()
+    # First history request of a symbol may have terminal load history, keep it out of first iteration
+    mt5.copy_rates_from_pos(trade_params['symbol'], trade_timeframe, 0, WARMUP_BARS)
+    if exposure_tracker is not None:
+        account_info = exposure_terminal.account_info()
+        if account_info is not None:
+            exposure_tracker.set_account_currency(account_info.currency)
+        # Prices are refreshed by every tick the bot fetches afterwards
+        exposure_terminal.symbol_info_tick(trade_params['symbol'])
+        exposure_terminal.positions_get()
+    startup_times['warm-up'] = time.perf_counter() - phase_start_time
+
+    phase_start_time = time.perf_counter()
+    config_watcher = None if args.no_reload else ConfigWatcher(args.config_file, config_data)
+    if args.startup_only:
+        # Features with their own terminal connections or threads would log in just to be stopped again
+        logger.info("Not starting accounts, trade database, exit manager and exposure sync since bot only starts up")
+    account_pool = start_account_pool(config_data, args)
+    trade_database = None
+    if args.trade_db and not args.startup_only:
+        from trade_db import TradeDatabase
+        trade_database = TradeDatabase(args.trade_db)
+        trade_database.start()
+        set_trade_database(trade_database)
+    exit_manager = None
+    if args.exit_manager and not args.startup_only:
+        from exit_manager import ExitManager
+        exit_manager = ExitManager(trade_timeframe, lambda: config_watcher.config_data if config_watcher is not None else config_data)
+        exit_manager.start()
+    exposure_sync = None
+    if exposure_tracker is not None and not args.startup_only:
+        from exposure import ExposureSync
+        exposure_sync = ExposureSync(exposure_terminal)
+        exposure_sync.start()
+    if args.bar_bus:
+        from bar_bus import BarBusTerminal
+        bar_bus = BarBusTerminal(mt5)
+        use_terminal(bar_bus)
+    if args.profile:
+        from profiler import IterationProfiler, ProfiledTerminal
+        profiler = IterationProfiler(f"logs/profile_{curr_dt}_{os.getpid()}.folded", report_every=args.profile_every,
+                                     duration=args.profile_duration)
+        use_terminal(ProfiledTerminal(mt5, profiler))
+    if args.simulate:
+        from simulation import SimulationMonitor
+        simulation_monitor = SimulationMonitor(report_every=args.simulate_report_every)
+    startup_times['features'] = time.perf_counter() - phase_start_time
+    logger.info(f"Startup took {(time.perf_counter() - process_start_time) * 1000:.0f}ms: "
+                + ', '.join(f"{phase}: {phase_time * 1000:.0f}ms" for phase, phase_time in startup_times.items()))
+
+    if not args.startup_only:
+        if profiler is not None:
+            profiler.start()
+        if simulation_monitor is not None:
+            simulation_monitor.start()
+        try:
+            main(strategy_name, trade_timeframe, trade_params, strategy_params, config_watcher)
+        except SimulationFinished:
+            logger.info(f"Simulation finished at {get_clock().now()}")
+        except JournalExhausted as ex:
+            logger.info(f"Replay finished: {ex}")
+    if simulation_monitor is not None:
+        simulation_monitor.stop()
+    if profiler is not None:
+        profiler.stop()
+    if account_pool is not None:
+        account_pool.stop()
+    if exit_manager is not None:
+        exit_manager.stop()
+    if exposure_sync is not None:
+        exposure_sync.stop()
+    if trade_database is not None:
+        trade_database.stop()
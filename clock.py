@@ -0,0 +1,139 @@
+import time
+import logging
+import threading
+from datetime import datetime
+
+
+class SimulationFinished(BaseException):
+    """
+    Raised by virtual clock once end of simulated time is reached. Not an Exception so that error handling of
+    strategy loops lets it through, like KeyboardInterrupt
+    """
+
+
+class JournalExhausted(BaseException):
+    """
+    Raised by replay terminal when journal has no more responses for a call i.e. replay has finished. Not an
+    Exception so that error handling of strategy loops lets it through, like SimulationFinished
+    """
+
+
+class SystemClock:
+    """
+    Wall clock time and real sleeps
+    """
+    def time(self):
+        return time.time()
+
+    def now(self):
+        return datetime.fromtimestamp(self.time())
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+    def wait(self, event, timeout):
+        """
+        Wait until event is set or timeout seconds have passed
+        returns:
+            True if event was set else False
+        """
+        return event.wait(timeout)
+
+
+class VirtualClock(SystemClock):
+    """
+    Clock which skips sleeps. Time passes at real speed while code is running, so iteration costs still show up
+    as timing drift, but every sleep advances time instantly. Threads waiting on clock e.g. scheduler waiting
+    for next bar close are woken at their deadline, and time does not advance further until they wait again.
+    """
+    def __init__(self, start_time, end_time=None):
+        """
+        args:
+            start_time: Simulated time in seconds since epoch when clock is created
+            end_time: Simulated time after which sleeping raises SimulationFinished, None to run forever
+        """
+        self.virtual_time = start_time
+        self.end_time = end_time
+        self.real_anchor = time.perf_counter()
+        self.advanced = threading.Condition()
+        # Deadline and stop event per waiting thread
+        self.waiters = {}
+        # Stop event per thread woken by clock which has not waited again yet
+        self.running = {}
+
+    def time(self):
+        return self.virtual_time + time.perf_counter() - self.real_anchor
+
+    def _advance_to(self, target):
+        now = time.perf_counter()
+        self.virtual_time = max(target, self.virtual_time + now - self.real_anchor)
+        self.real_anchor = now
+        self.advanced.notify_all()
+
+    def sleep(self, seconds):
+        with self.advanced:
+            target = self.time() + max(seconds, 0)
+            while True:
+                # Woken threads finish their work at the time they were woken
+                while any(not event.is_set() for event in self.running.values()):
+                    self.advanced.wait(0.05)
+                due = [deadline for deadline, event in self.waiters.values() if deadline <= target and not event.is_set()]
+                step = min(due, default=target)
+                self._advance_to(step)
+                if step >= target:
+                    break
+                while any(deadline <= step and not event.is_set() for deadline, event in self.waiters.values()):
+                    self.advanced.wait(0.05)
+        if self.end_time is not None and self.virtual_time >= self.end_time:
+            raise SimulationFinished()
+
+    def wait(self, event, timeout):
+        thread_id = threading.get_ident()
+        with self.advanced:
+            self.running.pop(thread_id, None)
+            self.advanced.notify_all()
+            deadline = self.time() + timeout
+            self.waiters[thread_id] = (deadline, event)
+            while not event.is_set() and self.time() < deadline:
+                if self.end_time is not None and self.virtual_time >= self.end_time:
+                    break
+                # Short real timeout so that event is noticed without clock advancing
+                self.advanced.wait(0.05)
+            del self.waiters[thread_id]
+            finished = self.end_time is not None and self.virtual_time >= self.end_time
+            if not event.is_set() and not finished:
+                self.running[thread_id] = event
+            self.advanced.notify_all()
+        if finished:
+            # Simulation is over, thread is only woken to stop instead of waiting again right away
+            event.wait()
+        return event.is_set()
+
+
+# Clock used by loops, scheduler and logging, see set_clock
+clock = SystemClock()
+default_log_record_factory = logging.getLogRecordFactory()
+
+
+def get_clock():
+    return clock
+
+def set_clock(new_clock):
+    """
+    Use given clock for loop sleeps, scheduler and log timestamps of this process
+    args:
+        new_clock: Clock e.g. VirtualClock for simulations
+    returns:
+        previous: Clock which was in use before
+    """
+    global clock
+    previous = clock
+    clock = new_clock
+    logging.setLogRecordFactory(default_log_record_factory if type(new_clock) is SystemClock else clock_log_record_factory)
+    return previous
+
+def clock_log_record_factory(*args, **kwargs):
+    record = default_log_record_factory(*args, **kwargs)
+    record.created = clock.time()
+    record.msecs = (record.created - int(record.created)) * 1000
+    return record
@@ -0,0 +1,87 @@
+import os
+import copy
+import logging
+from utils import read_config, validate_config, parse_config
+
+logger = logging.getLogger(__name__)
+
+# Trade params bound to the running terminal session and strategy loop. Changing them needs a restart
+RESTART_ONLY_TRADE_PARAMS = ('symbol', 'strategy', 'timeframe')
+
+
+class ConfigWatcher:
+    """
+    Watch configuration file of a running bot and hand over validated changes to its trading loop.
+    Polled once per loop iteration so params are only ever swapped between iterations.
+    """
+    def __init__(self, config_fpath, config_data):
+        """
+        args:
+            config_fpath: Configuration file path being watched
+            config_data: Configuration data the bot was started with (already validated)
+        """
+        self.config_fpath = config_fpath
+        self.config_data = config_data
+        self.file_signature = self._file_signature()
+
+    def _file_signature(self):
+        """
+        Cheap change detection using modification time and size of configuration file
+        """
+        try:
+            stat = os.stat(self.config_fpath)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def poll(self):
+        """
+        Check configuration file for changes and swap in new params if they are valid
+        returns:
+            trade_params: Trading params to be used for next iteration
+            strategy_params: Strategy params to be used for next iteration
+        """
+        file_signature = self._file_signature()
+        if file_signature is None or file_signature == self.file_signature:
+            _, trade_params, strategy_params = parse_config(self.config_data)
+            return trade_params, strategy_params
+
+        # Remember signature even when reload fails so that broken file is reported only once
+        self.file_signature = file_signature
+        try:
+            new_config_data = self._merge_restart_only_params(read_config(self.config_fpath))
+            validate_config(new_config_data)
+        except (OSError, ValueError) as ex:
+            logger.error(f"Ignoring invalid configuration change in {self.config_fpath}: {ex}")
+            _, trade_params, strategy_params = parse_config(self.config_data)
+            return trade_params, strategy_params
+
+        self.config_data = new_config_data
+        logger.info(f"Reloaded configuration from {self.config_fpath}")
+        _, trade_params, strategy_params = parse_config(self.config_data)
+        return trade_params, strategy_params
+
+    def _merge_restart_only_params(self, new_config_data):
+        """
+        Keep params which can not be changed while bot is running from current configuration
+        args:
+            new_config_data: Newly loaded configuration data
+        returns:
+            Configuration data to be swapped in
+        """
+        if not isinstance(new_config_data, dict) or not isinstance(new_config_data.get('trade_params'), dict):
+            raise ValueError("Missing configuration section: trade_params")
+        new_config_data = copy.deepcopy(new_config_data)
+        if new_config_data.get('credentials') != self.config_data['credentials']:
+            logger.warning("Credentials changed in configuration file. Restart the bot to use them")
+            new_config_data['credentials'] = self.config_data['credentials']
+        if new_config_data.get('accounts', []) != self.config_data.get('accounts', []):
+            logger.warning("Accounts changed in configuration file. Restart the bot to use them")
+            new_config_data['accounts'] = self.config_data.get('accounts', [])
+        for key in RESTART_ONLY_TRADE_PARAMS:
+            old_value = self.config_data['trade_params'][key]
+            new_value = new_config_data['trade_params'].get(key)
+            if new_value != old_value:
+                logger.warning(f"Trade param {key} changed to {new_value}. Restart the bot to use it, keeping: {old_value}")
+                new_config_data['trade_params'][key] = old_value
+        return new_config_data
@@ -0,0 +1,156 @@
+import logging
+import threading
+import numpy as np
+import MetaTrader5 as mt5
+from mt5_interface import cancel_orders, get_symbol_info
+from utils import timeframe_seconds
+from clock import get_clock
+
+logger = logging.getLogger(__name__)
+
+# Magic number of orders placed by the bot, see order_manager
+BOT_MAGIC = 123456
+
+# Comment of positions opened by Aroon strategy, see bot
+AROON_COMMENT = 'AR custom trading bot'
+
+# Seconds to wait after bar close so that terminal has the closed bar
+BAR_CLOSE_DELAY = 1.0
+
+
+class ExitManager:
+    """
+    Evaluates exit rules for all open positions of the bot, across all symbols, once per bar close and closes
+    positions which hit any rule in a single batch. Runs in its own thread so that exit checks do not delay
+    entry signals.
+    Rules:
+        Aroon exit: Buy positions opened by Aroon strategy are closed when Aroon up reaches up_line_exit_thresh,
+                    sell positions when Aroon down falls to down_line_exit_thresh (AROON_CUSTOM_ENTRY_EXIT
+                    strategy params)
+        Trailing stop: Positions are closed when closing price i.e. bid for buys and ask for sells retraces
+                       trailing_stop_pips points from its best value since position was opened (trade params,
+                       disabled if not set)
+        Time stop: Positions are closed when held for max_holding_minutes (trade params, disabled if not set)
+    """
+    def __init__(self, timeframe, get_config, window_size=25):
+        """
+        args:
+            timeframe: Timeframe bars are evaluated on
+            get_config: Function returning current configuration data
+            window_size: Aroon window size
+        """
+        self.timeframe = timeframe
+        self.get_config = get_config
+        self.window_size = window_size
+        # Best closing price seen per position ticket for trailing stops
+        self.best_prices = {}
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name='exit-manager', daemon=True)
+        self.thread.start()
+        logger.info(f"Started exit manager for timeframe: {self.timeframe}")
+
+    def stop(self):
+        self.stopped.set()
+
+    def _run(self):
+        bar_seconds = timeframe_seconds(self.timeframe)
+        while not self.stopped.is_set():
+            # Wait for next bar close
+            clock = get_clock()
+            wait_time = bar_seconds - clock.time() % bar_seconds + BAR_CLOSE_DELAY
+            if clock.wait(self.stopped, wait_time):
+                break
+            try:
+                self.evaluate()
+            except Exception as ex:
+                logger.error(f"Exit manager failed to evaluate open positions: {ex}", exc_info=True)
+
+    def evaluate(self):
+        """
+        Evaluate exit rules for all open positions and close the ones which hit any rule
+        returns:
+            List of (ticket, symbol) tuples of positions which were closed
+        """
+        config_data = self.get_config()
+        trade_params = config_data['trade_params']
+        aroon_params = config_data['strategy_params'].get('AROON_CUSTOM_ENTRY_EXIT', {})
+
+        positions = [position for position in (mt5.positions_get() or ()) if position.magic == BOT_MAGIC]
+        open_tickets = {position.ticket for position in positions}
+        self.best_prices = {ticket: price for ticket, price in self.best_prices.items() if ticket in open_tickets}
+        if not positions:
+            return []
+
+        # Latest closed bars of every symbol with open positions, fetched once per symbol
+        bar_seconds = timeframe_seconds(self.timeframe)
+        symbols = sorted({position.symbol for position in positions})
+        n_symbols = len(symbols)
+        highs = np.full((n_symbols, self.window_size), np.nan)
+        lows = np.full((n_symbols, self.window_size), np.nan)
+        spreads = np.zeros(n_symbols)
+        bar_close_times = np.zeros(n_symbols)
+        points = np.zeros(n_symbols)
+        for index, symbol in enumerate(symbols):
+            rates = mt5.copy_rates_from_pos(symbol, self.timeframe, 1, self.window_size)
+            if rates is not None and len(rates) == self.window_size:
+                highs[index] = rates['high']
+                lows[index] = rates['low']
+                spreads[index] = rates['spread'][-1]
+                bar_close_times[index] = rates['time'][-1] + bar_seconds
+            symbol_info = get_symbol_info(symbol)
+            points[index] = symbol_info.point if symbol_info is not None else 0.0
+        has_bars = ~np.isnan(highs).any(axis=1)
+        # Same as last value of compute_aroon_values for each symbol
+        ar_up = np.where(has_bars, np.argmax(np.nan_to_num(highs, nan=-np.inf), axis=1) / self.window_size * 100, np.nan)
+        ar_down = np.where(has_bars, np.argmin(np.nan_to_num(lows, nan=np.inf), axis=1) / self.window_size * 100, np.nan)
+
+        # Open positions as columns
+        symbol_index = {symbol: index for index, symbol in enumerate(symbols)}
+        tickets = np.array([position.ticket for position in positions], dtype=np.int64)
+        symbol_idx = np.array([symbol_index[position.symbol] for position in positions])
+        is_buy = np.array([position.type == mt5.POSITION_TYPE_BUY for position in positions])
+        is_aroon = np.array([position.comment == AROON_COMMENT for position in positions])
+        # Current closing price of position, bid for buys and ask for sells
+        price_current = np.array([position.price_current for position in positions])
+        open_times = np.array([position.time for position in positions], dtype=np.float64)
+        prev_best = np.array([self.best_prices.get(position.ticket, position.price_current) for position in positions])
+
+        # Aroon exit
+        up_exit = aroon_params.get('up_line_exit_thresh')
+        down_exit = aroon_params.get('down_line_exit_thresh')
+        aroon_exit = np.zeros(len(positions), dtype=bool)
+        if up_exit is not None and down_exit is not None:
+            with np.errstate(invalid='ignore'):
+                aroon_exit = is_aroon & ((is_buy & (ar_up[symbol_idx] >= up_exit)) | (~is_buy & (ar_down[symbol_idx] <= down_exit)))
+
+        # Trailing stop using highs/lows of latest closed bar, if position was already open when bar started.
+        # Bars are made of bids, so spread of bar is added to lows to get best ask of sells
+        held_during_bar = has_bars[symbol_idx] & (open_times <= bar_close_times[symbol_idx] - bar_seconds)
+        last_high = np.where(held_during_bar, highs[symbol_idx, -1], -np.inf)
+        last_low = np.where(held_during_bar, lows[symbol_idx, -1] + spreads[symbol_idx] * points[symbol_idx], np.inf)
+        best = np.where(is_buy, np.maximum.reduce([prev_best, price_current, last_high]),
+                        np.minimum.reduce([prev_best, price_current, last_low]))
+        self.best_prices.update(zip(tickets.tolist(), best.tolist()))
+        trailing_exit = np.zeros(len(positions), dtype=bool)
+        trailing_stop_pips = trade_params.get('trailing_stop_pips')
+        if trailing_stop_pips:
+            distance = trailing_stop_pips * points[symbol_idx]
+            trailing_exit = np.where(is_buy, best - price_current, price_current - best) >= distance
+
+        # Time stop, measured in terminal server time
+        time_exit = np.zeros(len(positions), dtype=bool)
+        max_holding_minutes = trade_params.get('max_holding_minutes')
+        if max_holding_minutes:
+            time_exit = has_bars[symbol_idx] & (bar_close_times[symbol_idx] - open_times >= max_holding_minutes * 60)
+
+        to_close = aroon_exit | trailing_exit | time_exit
+        if not to_close.any():
+            return []
+        positions_to_close = [(int(tickets[index]), symbols[symbol_idx[index]]) for index in np.flatnonzero(to_close)]
+        logger.info(f"Closing {len(positions_to_close)} of {len(positions)} open positions, aroon exits: {int(aroon_exit.sum())}, "
+                    f"trailing stops: {int(trailing_exit.sum())}, time stops: {int(time_exit.sum())}: {positions_to_close}")
+        cancel_orders(positions_to_close)
+        return positions_to_close
@@ -0,0 +1,342 @@
+import logging
+import threading
+import numpy as np
+from clock import get_clock
+
+logger = logging.getLogger(__name__)
+
+# Clock seconds between reconciliations of tracker with open positions of terminal
+SYNC_INTERVAL_SECS = 5
+
+
+class ExposureTracker:
+    """
+    In-process mark-to-market of open positions. Positions are kept as array columns (ticket, volume, open price,
+    direction, symbol index) and summed into per-symbol long/short units and costs as they are opened or closed,
+    so a tick only updates floating PnL of its symbol. Totals per currency are computed vectorially over symbols.
+    Exposure of a currency is the net amount of it held, converted to account currency using latest prices of
+    tracked symbols. Currencies which can't be converted have NaN exposure value and are not limited.
+    """
+    def __init__(self, account_currency='USD', capacity=64):
+        """
+        args:
+            account_currency: Currency exposure values and floating PnL totals are expressed in
+            capacity: Initial no. of positions columns are allocated for
+        """
+        self.account_currency = account_currency
+        self.lock = threading.RLock()
+        # Open positions as columns, first n_positions rows are in use
+        self.tickets = np.zeros(capacity, dtype=np.int64)
+        self.volumes = np.zeros(capacity)
+        self.open_prices = np.zeros(capacity)
+        self.directions = np.zeros(capacity, dtype=np.int8)
+        self.symbol_idx = np.zeros(capacity, dtype=np.int32)
+        self.n_positions = 0
+        self.rows = {}
+        # Change no. at which each ticket was last added or removed, so that listings taken before don't undo it
+        self.n_changes = 0
+        self.changed_tickets = {}
+        # Per symbol columns
+        self.symbols = []
+        self.symbol_index = {}
+        self.contract_sizes = np.zeros(0)
+        self.base_idx = np.zeros(0, dtype=np.int32)
+        self.profit_idx = np.zeros(0, dtype=np.int32)
+        self.bids = np.zeros(0)
+        self.asks = np.zeros(0)
+        self.long_units = np.zeros(0)
+        self.long_costs = np.zeros(0)
+        self.short_units = np.zeros(0)
+        self.short_costs = np.zeros(0)
+        self.floating_pnls = np.zeros(0)
+        self.currencies = []
+        self.currency_index = {}
+        self._currency(account_currency)
+
+    def _currency(self, currency):
+        if currency not in self.currency_index:
+            self.currency_index[currency] = len(self.currencies)
+            self.currencies.append(currency)
+        return self.currency_index[currency]
+
+    def set_account_currency(self, currency):
+        with self.lock:
+            self.account_currency = currency
+            self._currency(currency)
+
+    def has_symbol(self, symbol):
+        return symbol in self.symbol_index
+
+    def add_symbol(self, symbol, contract_size, currency_base, currency_profit):
+        """
+        Register symbol specification, needed before positions or ticks of symbol are tracked
+        """
+        with self.lock:
+            if symbol in self.symbol_index:
+                return
+            self.symbol_index[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+            self.contract_sizes = np.append(self.contract_sizes, contract_size)
+            self.base_idx = np.append(self.base_idx, np.int32(self._currency(currency_base)))
+            self.profit_idx = np.append(self.profit_idx, np.int32(self._currency(currency_profit)))
+            for name in ('bids', 'asks', 'long_units', 'long_costs', 'short_units', 'short_costs', 'floating_pnls'):
+                setattr(self, name, np.append(getattr(self, name), 0.0))
+
+    def _grow(self):
+        capacity = len(self.tickets) * 2
+        for name in ('tickets', 'volumes', 'open_prices', 'directions', 'symbol_idx'):
+            column = getattr(self, name)
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[:self.n_positions] = column[:self.n_positions]
+            setattr(self, name, grown)
+
+    def _update_symbol(self, index, direction, units, open_price):
+        if direction > 0:
+            self.long_units[index] += units
+            self.long_costs[index] += units * open_price
+        else:
+            self.short_units[index] += units
+            self.short_costs[index] += units * open_price
+        self._mark(index)
+
+    def _mark(self, index):
+        self.floating_pnls[index] = (self.long_units[index] * self.bids[index] - self.long_costs[index]
+                                     + self.short_costs[index] - self.short_units[index] * self.asks[index])
+
+    def _changed(self, ticket):
+        self.changed_tickets[ticket] = self.n_changes
+        self.n_changes += 1
+
+    def add_position(self, ticket, symbol, direction, volume, open_price):
+        """
+        args:
+            ticket: Position ticket
+            symbol: Symbol of position, must be registered using add_symbol
+            direction: 1 for buy and -1 for sell positions
+            volume: Volume in lots
+            open_price: Open price of position
+        """
+        with self.lock:
+            if ticket in self.rows:
+                return
+            if self.n_positions == len(self.tickets):
+                self._grow()
+            row = self.n_positions
+            index = self.symbol_index[symbol]
+            self.tickets[row] = ticket
+            self.volumes[row] = volume
+            self.open_prices[row] = open_price
+            self.directions[row] = direction
+            self.symbol_idx[row] = index
+            self.rows[ticket] = row
+            self.n_positions += 1
+            self._changed(ticket)
+            self._update_symbol(index, direction, volume * self.contract_sizes[index], open_price)
+
+    def remove_position(self, ticket):
+        with self.lock:
+            row = self.rows.pop(ticket, None)
+            if row is None:
+                return
+            self._changed(ticket)
+            index = self.symbol_idx[row]
+            self._update_symbol(index, self.directions[row], -self.volumes[row] * self.contract_sizes[index], self.open_prices[row])
+            # Move last position into freed row
+            last = self.n_positions - 1
+            if row != last:
+                for column in (self.tickets, self.volumes, self.open_prices, self.directions, self.symbol_idx):
+                    column[row] = column[last]
+                self.rows[int(self.tickets[row])] = row
+            self.n_positions = last
+
+    def sync(self, positions, symbol=None, buy_type=0, since=None):
+        """
+        Reconcile tracked positions with positions reported by terminal e.g. after stop loss or take profit hits
+        args:
+            positions: Open positions as returned by positions_get, their symbols must be registered
+            symbol: Symbol positions were fetched for, None if all positions were fetched
+            buy_type: Position type of buy positions
+            since: Value of n_changes when positions were requested. Positions opened or closed by orders
+                   meanwhile are left as they are, since listing may predate them
+        """
+        with self.lock:
+            if since is not None:
+                self.changed_tickets = {ticket: change for ticket, change in self.changed_tickets.items() if change >= since}
+            skipped = set(self.changed_tickets) if since is not None else set()
+            open_tickets = {position.ticket for position in positions}
+            tracked = self.tickets[:self.n_positions]
+            if symbol is not None:
+                tracked = tracked[self.symbol_idx[:self.n_positions] == self.symbol_index.get(symbol, -1)]
+            for ticket in set(tracked.tolist()) - open_tickets - skipped:
+                self.remove_position(ticket)
+            for position in positions:
+                if position.ticket not in skipped:
+                    self.add_position(position.ticket, position.symbol, 1 if position.type == buy_type else -1,
+                                      position.volume, position.price_open)
+
+    def on_tick(self, symbol, bid, ask):
+        """
+        Mark positions of symbol to latest prices
+        """
+        index = self.symbol_index.get(symbol)
+        if index is None:
+            return
+        with self.lock:
+            self.bids[index] = bid
+            self.asks[index] = ask
+            self._mark(index)
+
+    def conversion_rates(self):
+        """
+        Rate of every currency to account currency using latest prices, NaN if no tracked symbol converts it
+        """
+        rates = np.full(len(self.currencies), np.nan)
+        mids = (self.bids + self.asks) / 2
+        priced = mids > 0
+        account_idx = self.currency_index[self.account_currency]
+        quoted_in_account = priced & (self.profit_idx == account_idx)
+        rates[self.base_idx[quoted_in_account]] = mids[quoted_in_account]
+        account_is_base = priced & (self.base_idx == account_idx)
+        rates[self.profit_idx[account_is_base]] = 1 / mids[account_is_base]
+        rates[account_idx] = 1.0
+        return rates
+
+    def _exposures(self):
+        n_currencies = len(self.currencies)
+        net_units = self.long_units - self.short_units
+        mids = (self.bids + self.asks) / 2
+        return (np.bincount(self.base_idx, weights=net_units, minlength=n_currencies)
+                - np.bincount(self.profit_idx, weights=net_units * mids, minlength=n_currencies))
+
+    def exposures(self):
+        """
+        returns:
+            Dict of currency to tuple of net amount held in that currency and its value in account currency
+        """
+        with self.lock:
+            amounts = self._exposures()
+            values = amounts * self.conversion_rates()
+        return {currency: (amounts[index], values[index]) for index, currency in enumerate(self.currencies)}
+
+    def floating_pnl(self):
+        """
+        returns:
+            Total floating PnL of tracked positions in account currency, NaN if a profit currency can't be converted
+        """
+        with self.lock:
+            return float((self.floating_pnls * self.conversion_rates()[self.profit_idx]).sum())
+
+    def check_order(self, symbol, direction, volume, max_exposure):
+        """
+        Check whether an order would take exposure of its base or profit currency beyond limit. Orders which
+        reduce exposure are always allowed
+        args:
+            symbol: Symbol to be traded, must be registered
+            direction: 1 for buy and -1 for sell orders
+            volume: Volume in lots
+            max_exposure: Max absolute exposure per currency in account currency
+        returns:
+            True if order is within limit else False
+        """
+        with self.lock:
+            index = self.symbol_index[symbol]
+            amounts = self._exposures()
+            rates = self.conversion_rates()
+            units = direction * volume * self.contract_sizes[index]
+            mid = (self.bids[index] + self.asks[index]) / 2
+            currency_idx = np.array([self.base_idx[index], self.profit_idx[index]])
+            before = np.abs(amounts[currency_idx] * rates[currency_idx])
+            after = np.abs((amounts[currency_idx] + np.array([units, -units * mid])) * rates[currency_idx])
+        exceeded = (after > max_exposure) & (after > before)
+        if exceeded.any():
+            logger.warning(f"Order of {volume} lots of {symbol} would take exposure of "
+                           f"{[self.currencies[currency] for currency in currency_idx[exceeded]]} to {after[exceeded]} "
+                           f"{self.account_currency} beyond limit of {max_exposure}")
+            return False
+        return True
+
+
+class ExposureTerminal:
+    """
+    Terminal wrapper feeding ticks, filled orders, closes and position listings the bot already fetches into
+    exposure tracker. Install it using terminal.use_terminal
+    """
+    def __init__(self, terminal, tracker):
+        self._terminal = terminal
+        self._tracker = tracker
+
+    def __getattr__(self, name):
+        return getattr(self._terminal, name)
+
+    def _register(self, symbol):
+        if not self._tracker.has_symbol(symbol):
+            symbol_info = self._terminal.symbol_info(symbol)
+            if symbol_info is not None:
+                self._tracker.add_symbol(symbol, symbol_info.trade_contract_size, symbol_info.currency_base,
+                                         symbol_info.currency_profit)
+        return self._tracker.has_symbol(symbol)
+
+    def symbol_info_tick(self, symbol):
+        tick = self._terminal.symbol_info_tick(symbol)
+        if tick is not None and self._register(symbol):
+            self._tracker.on_tick(symbol, tick.bid, tick.ask)
+        return tick
+
+    def positions_get(self, *args, **kwargs):
+        since = self._tracker.n_changes
+        positions = self._terminal.positions_get(*args, **kwargs)
+        # Only listings of all positions or of all positions of a symbol are complete
+        if positions is not None and not args and set(kwargs) <= {'symbol'}:
+            if all(self._register(position.symbol) for position in positions):
+                self._tracker.sync(positions, kwargs.get('symbol'), self._terminal.POSITION_TYPE_BUY, since=since)
+        return positions
+
+    def order_send(self, request):
+        result = self._terminal.order_send(request)
+        if result is not None and result.retcode == self._terminal.TRADE_RETCODE_DONE:
+            if request.get('position'):
+                # Partial closes are picked up by next position listing
+                self._tracker.remove_position(request['position'])
+            elif request.get('action') == self._terminal.TRADE_ACTION_DEAL and self._register(request['symbol']):
+                # Position ticket is the ticket of the order which opened it
+                direction = 1 if request['type'] == self._terminal.ORDER_TYPE_BUY else -1
+                self._tracker.add_position(result.order, request['symbol'], direction, result.volume, result.price)
+        return result
+
+    def Close(self, symbol, *args, **kwargs):
+        closed = self._terminal.Close(symbol, *args, **kwargs)
+        if closed and kwargs.get('ticket') is not None:
+            self._tracker.remove_position(kwargs['ticket'])
+        return closed
+
+
+class ExposureSync:
+    """
+    Reconciles exposure tracker with open positions of terminal in a background thread, so that positions closed
+    by terminal e.g. on stop loss or take profit hits leave tracker without a terminal call on the order path
+    """
+    def __init__(self, exposure_terminal, interval=SYNC_INTERVAL_SECS):
+        """
+        args:
+            exposure_terminal: Exposure terminal positions are listed through
+            interval: Clock seconds between two reconciliations
+        """
+        self.exposure_terminal = exposure_terminal
+        self.interval = interval
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name='exposure-sync', daemon=True)
+        self.thread.start()
+        logger.info(f"Reconciling exposure tracker with open positions every {self.interval}s")
+
+    def stop(self):
+        self.stopped.set()
+
+    def _run(self):
+        while not get_clock().wait(self.stopped, self.interval):
+            try:
+                self.exposure_terminal.positions_get()
+            except Exception as ex:
+                logger.error(f"Failed to reconcile exposure tracker with open positions: {ex}")
@@ -0,0 +1,183 @@
+import time
+import struct
+import pickle
+import logging
+import threading
+from collections import namedtuple, deque, Counter
+import numpy as np
+from clock import JournalExhausted
+
+logger = logging.getLogger(__name__)
+
+# Terminal calls captured in journal. Record stores index of call in this tuple
+RECORDED_CALLS = ('copy_rates_from_pos', 'symbol_info_tick', 'symbol_info', 'positions_get', 'order_send')
+
+JOURNAL_MAGIC = b'MT5J'
+JOURNAL_VERSION = 1
+HEADER = struct.Struct('<4sH')
+# Record header: call index, wall time of call, length of pickled call data, length of raw array data
+RECORD_HEADER = struct.Struct('<BdIQ')
+
+
+def _to_plain(value):
+    """
+    Convert terminal response to plain python structure which can be pickled without MetaTrader5 package
+    """
+    if hasattr(value, '_asdict'):
+        return ('__namedtuple__', type(value).__name__, tuple(value._fields), tuple(_to_plain(item) for item in value))
+    if isinstance(value, tuple):
+        return tuple(_to_plain(item) for item in value)
+    if isinstance(value, dict):
+        return {key: _to_plain(item) for key, item in value.items()}
+    return value
+
+_namedtuple_types = {}
+
+def _from_plain(value):
+    """
+    Rebuild terminal response from its plain python structure
+    """
+    if isinstance(value, tuple):
+        if len(value) == 4 and value[0] == '__namedtuple__':
+            _, type_name, fields, items = value
+            nt_type = _namedtuple_types.get((type_name, fields))
+            if nt_type is None:
+                nt_type = _namedtuple_types[(type_name, fields)] = namedtuple(type_name, fields)
+            return nt_type(*(_from_plain(item) for item in items))
+        return tuple(_from_plain(item) for item in value)
+    if isinstance(value, dict):
+        return {key: _from_plain(item) for key, item in value.items()}
+    return value
+
+
+class RecordingTerminal:
+    """
+    Terminal wrapper which appends every recorded call along with its response to journal file.
+    Install it using terminal.use_terminal
+    """
+    def __init__(self, terminal, journal_fpath):
+        """
+        args:
+            terminal: Terminal whose calls are recorded
+            journal_fpath: Journal file path, appended to if it already exists
+        """
+        self._terminal = terminal
+        self._lock = threading.Lock()
+        self._file = open(journal_fpath, 'ab')
+        if self._file.tell() == 0:
+            self._file.write(HEADER.pack(JOURNAL_MAGIC, JOURNAL_VERSION))
+        for call_name in RECORDED_CALLS:
+            setattr(self, call_name, self._recorder(RECORDED_CALLS.index(call_name), getattr(terminal, call_name)))
+
+    def __getattr__(self, name):
+        return getattr(self._terminal, name)
+
+    def _recorder(self, call_index, call):
+        def recorded_call(*args, **kwargs):
+            response = call(*args, **kwargs)
+            self._write(call_index, args, kwargs, response)
+            return response
+        return recorded_call
+
+    def _write(self, call_index, args, kwargs, response):
+        array_data = b''
+        if isinstance(response, np.ndarray):
+            # Rates are stored as raw array bytes, only their dtype and shape are pickled
+            array_data = response.tobytes()
+            response = ('__ndarray__', np.lib.format.dtype_to_descr(response.dtype), response.shape)
+        call_data = pickle.dumps((_to_plain(args), _to_plain(kwargs), _to_plain(response)), protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._file.write(RECORD_HEADER.pack(call_index, time.time(), len(call_data), len(array_data)))
+            self._file.write(call_data)
+            self._file.write(array_data)
+            # Flush every record so that journal is usable even if bot gets killed
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+def read_journal(journal_fpath):
+    """
+    Read all records of journal file
+    args:
+        journal_fpath: Journal file path
+    returns:
+        List of records as tuple of call name, call time, args, kwargs and response
+    """
+    records = []
+    with open(journal_fpath, 'rb') as f:
+        magic, version = HEADER.unpack(f.read(HEADER.size))
+        if magic != JOURNAL_MAGIC or version != JOURNAL_VERSION:
+            raise ValueError(f"{journal_fpath} is not a version {JOURNAL_VERSION} terminal journal")
+        while True:
+            record_header = f.read(RECORD_HEADER.size)
+            if len(record_header) < RECORD_HEADER.size:
+                break
+            call_index, call_time, call_data_len, array_data_len = RECORD_HEADER.unpack(record_header)
+            call_data = f.read(call_data_len)
+            array_data = f.read(array_data_len)
+            if len(call_data) < call_data_len or len(array_data) < array_data_len:
+                logger.warning(f"Ignoring truncated record at end of journal: {journal_fpath}")
+                break
+            args, kwargs, response = pickle.loads(call_data)
+            if isinstance(response, tuple) and len(response) == 3 and response[0] == '__ndarray__':
+                dtype = np.lib.format.descr_to_dtype(response[1])
+                response = np.frombuffer(bytearray(array_data), dtype=dtype).reshape(response[2])
+            else:
+                response = _from_plain(response)
+            records.append((RECORDED_CALLS[call_index], call_time, _from_plain(args), _from_plain(kwargs), response))
+    return records
+
+
+class ReplayTerminal:
+    """
+    Terminal which answers recorded calls with responses from journal, in recorded order and without waiting.
+    Constants are taken from given terminal which defaults to stand-in terminal.
+    """
+    def __init__(self, journal_fpath, constants=None):
+        """
+        args:
+            journal_fpath: Journal file path
+            constants: Object providing MetaTrader5 constants
+        """
+        if constants is None:
+            from sim_terminal import SimTerminal
+            constants = SimTerminal
+        self._constants = constants
+        self._responses = {call_name: deque() for call_name in RECORDED_CALLS}
+        for call_name, _, args, kwargs, response in read_journal(journal_fpath):
+            self._responses[call_name].append((args, kwargs, response))
+        self.mismatches = Counter()
+        logger.info(f"Loaded journal {journal_fpath} with {sum(len(responses) for responses in self._responses.values())} records")
+        for call_name in RECORDED_CALLS:
+            setattr(self, call_name, self._replayer(call_name))
+
+    def __getattr__(self, name):
+        if name.isupper():
+            return getattr(self._constants, name)
+        raise AttributeError(f"Terminal call {name} is not part of journal")
+
+    def _replayer(self, call_name):
+        responses = self._responses[call_name]
+        def replayed_call(*args, **kwargs):
+            if not responses:
+                raise JournalExhausted(f"No more recorded responses for {call_name}")
+            recorded_args, recorded_kwargs, response = responses.popleft()
+            # Replay only stays faithful as long as bot makes same calls. Order requests carry prices so are not compared
+            if call_name != 'order_send' and (recorded_args != args or recorded_kwargs != kwargs):
+                if not self.mismatches[call_name]:
+                    logger.warning(f"Replay diverged from journal for {call_name}: recorded {recorded_args} {recorded_kwargs}, got {args} {kwargs}")
+                self.mismatches[call_name] += 1
+            return response
+        return replayed_call
+
+    def initialize(self, *args, **kwargs):
+        return True
+
+    def shutdown(self):
+        return True
+
+    def last_error(self):
+        return (1, 'Success')
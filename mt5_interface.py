@@ -3,6 +3,12 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Symbol specification (point, digits, contract size) does not change during a session
+symbol_info_cache = {}
+
+# Local trade database order results are recorded to, see set_trade_database
+trade_database = None
+
 def initialize_mt5(config):
     """
     Initialize mt5 with credentials
@@ -18,6 +24,30 @@ def initialize_mt5(config):
                                 server=config['server'])
     return init_status
 
+def set_trade_database(database):
+    """
+    Record results of all orders sent by this process to local trade database
+    args:
+        database: Started trade database or None to stop recording
+    """
+    global trade_database
+    trade_database = database
+
+
+def get_symbol_info(symbol):
+    """
+    Fetch symbol info, cached per symbol to avoid a terminal round-trip on every order
+    args:
+        symbol: Symbol under consideration
+    returns:
+        Symbol info as returned by terminal
+    """
+    symbol_info = symbol_info_cache.get(symbol)
+    if symbol_info is None:
+        symbol_info = mt5.symbol_info(symbol)
+        if symbol_info is not None:
+            symbol_info_cache[symbol] = symbol_info
+    return symbol_info
 
 def send_order(request):
     """ 
@@ -30,6 +60,9 @@ def send_order(request):
     result = mt5.order_send(request)    
     # Print the result of the trade
     logger.info(f"Send order result: {str(result)}")
+    if trade_database is not None:
+        trade_database.record_order(result)
+    return result
 
 def cancel_orders(orders):
     """ 
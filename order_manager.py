@@ -1,6 +1,7 @@
 import logging
 import MetaTrader5 as mt5
-from mt5_interface import send_order
+from mt5_interface import send_order, get_symbol_info
+from signal_guard import check_signal, order_type_of
 logger = logging.getLogger(__name__)
 
 def fetch_pending_orders():
@@ -11,58 +12,75 @@ def fetch_pending_orders():
     return [order[0] for order in orders] 
 
 
-def place_order_without_sltp(symbol, signal, lot_size, comment='RSI Trading bot'):
+def place_order_without_sltp(symbol, signal, lot_size, comment='RSI Trading bot', signal_deadline=None, max_deviation_pips=None):
     """
     Place order for given symbol without setting SL or TP
     params:
         symbol: Symbol to be traded
         signal: Either its buy or sell signal
         lot_size: Lot size to be used for current order
+        signal_deadline: Max age in seconds of signal and its bars (defaults to bar duration of signal timeframe)
+        max_deviation_pips: Max price movement since signal in points
+    returns:
+        result: Order send result or None if no order was sent
     """
     if signal is not None:
         # Get the current market price
         tick = mt5.symbol_info_tick(symbol)            
-        symbol_info = mt5.symbol_info(symbol)
+        symbol_info = get_symbol_info(symbol)
         # Set the stop loss and take profit levels
         # stop_loss = price - 1000 * symbol_info.point
         # take_profit = price + 1000 * symbol_info.point
-        price = tick.bid if signal == mt5.ORDER_TYPE_BUY else tick.ask
+        order_type = order_type_of(signal)
+        price = tick.bid if order_type == mt5.ORDER_TYPE_BUY else tick.ask
+        if not check_signal(signal, tick, symbol_info.point, price, signal_deadline=signal_deadline, max_deviation_pips=max_deviation_pips):
+            return None
 
         logger.info(f"symbol point: {symbol_info.point}, price: {price}")            
         order_request = {
             'action': mt5.TRADE_ACTION_DEAL,
             'symbol': symbol,
             'volume': lot_size,
-            'type': signal,
+            'type': order_type,
             'price': price,
             'magic': 123456,
             'comment': comment,
             "type_time": mt5.ORDER_TIME_GTC,
             "type_filling": mt5.ORDER_FILLING_FOK,
         }
-        send_order(order_request)
+        result = send_order(order_request)
         logger.info(f"Sending order request: {order_request} without setting sl or tp")
+        return result
     else:
         logger.debug("Not placing any order since signal is None!!!!")
+        return None
 
-def place_order(symbol, signal, lot_size, SL_MARGIN=50, TP_MARGIN=25, comment='RSI Trading bot'):
+def place_order(symbol, signal, lot_size, SL_MARGIN=50, TP_MARGIN=25, comment='RSI Trading bot', signal_deadline=None, max_deviation_pips=None):
     """ 
     Place order for given symbol with specific signal and lot size
     params:
         symbol: Symbol to be traded
         signal: Either its buy or sell signal
         lot_size: Lot size to be used for current order
+        signal_deadline: Max age in seconds of signal and its bars (defaults to bar duration of signal timeframe)
+        max_deviation_pips: Max price movement since signal in points
+    returns:
+        result: Order send result or None if no order was sent
     """
     if signal is not None:
         # Get the current market price
         tick = mt5.symbol_info_tick(symbol)            
-        symbol_info = mt5.symbol_info(symbol)
+        symbol_info = get_symbol_info(symbol)
 
         # Set the stop loss and take profit levels        
-        price = tick.bid if signal == mt5.ORDER_TYPE_BUY else tick.ask
+        order_type = order_type_of(signal)
+        price = tick.bid if order_type == mt5.ORDER_TYPE_BUY else tick.ask
         multiplier = 10 ** 2 if symbol in ['BTCUSDm', 'ETHUSDm'] else 1
+        # Drop signals which are too old or whose price has moved too far, using tick fetched above
+        if not check_signal(signal, tick, symbol_info.point, price, multiplier, signal_deadline, max_deviation_pips):
+            return None
 
-        if signal == mt5.ORDER_TYPE_BUY:
+        if order_type == mt5.ORDER_TYPE_BUY:
             price = tick.bid
             # Set stop loss to SL points from current price
             stop_loss = price - (SL_MARGIN * symbol_info.point) * multiplier
@@ -80,7 +98,7 @@ def place_order(symbol, signal, lot_size, SL_MARGIN=50, TP_MARGIN=25, comment='R
             'action': mt5.TRADE_ACTION_DEAL,
             'symbol': symbol,
             'volume': lot_size,
-            'type': signal,
+            'type': order_type,
             'price': price,
             'sl': stop_loss,
             'tp': take_profit,
@@ -89,7 +107,9 @@ def place_order(symbol, signal, lot_size, SL_MARGIN=50, TP_MARGIN=25, comment='R
             "type_time": mt5.ORDER_TIME_GTC, 
             "type_filling": mt5.ORDER_FILLING_FOK, 
         }
-        send_order(order_request)
+        result = send_order(order_request)
         logger.info(f"Sending order request: {order_request}")
+        return result
     else:
-        logger.debug("Not placing any order since signal is None!!!!")
\ No newline at end of file
+        logger.debug("Not placing any order since signal is None!!!!")
+        return None
\ No newline at end of file
@@ -0,0 +1,199 @@
+import os
+import sys
+import time
+import logging
+import threading
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+# Stages time is attributed to, checked in this order against every frame of a sampled stack
+STAGE_RULES = (
+    ('terminal', ('profiler.py:timed_call',)),
+    ('logging', (f'{os.sep}logging{os.sep}',)),
+    ('indicators', ('talib', 'strategy_impl.py')),
+    ('order_submission', ('order_manager.py', 'mt5_interface.py', 'signal_guard.py')),
+    ('dataframe', (f'{os.sep}pandas{os.sep}', f'{os.sep}numpy{os.sep}')),
+)
+
+
+class ProfiledTerminal:
+    """
+    Terminal wrapper timing every terminal call. Install it using terminal.use_terminal
+    """
+    def __init__(self, terminal, profiler):
+        self._terminal = terminal
+        self._profiler = profiler
+        self._calls = {}
+
+    def __getattr__(self, name):
+        value = getattr(self._terminal, name)
+        if not callable(value) or name.isupper():
+            return value
+        timed = self._calls.get(name)
+        if timed is None:
+            profiler = self._profiler
+            def timed_call(*args, **kwargs):
+                start_time = time.perf_counter()
+                try:
+                    return value(*args, **kwargs)
+                finally:
+                    profiler.add_terminal_time(name, time.perf_counter() - start_time)
+            timed = self._calls[name] = timed_call
+        return timed
+
+
+class IterationProfiler:
+    """
+    Sampling profiler for strategy loop iterations. A background thread samples stack of trading thread
+    while an iteration is running and attributes each sample to a stage (terminal calls, dataframe construction,
+    indicator computation, logging, order submission or strategy code). Samples are written in collapsed stack
+    format which can be rendered using flamegraph.pl, speedscope or inferno.
+    """
+    def __init__(self, output_fpath, interval=0.005, report_every=100, top_n=10, duration=None):
+        """
+        args:
+            output_fpath: File collapsed stacks are written to
+            interval: Seconds between two samples
+            report_every: No. of iterations after which summary is logged and collapsed stacks are written
+            top_n: No. of stacks shown in summary
+            duration: Seconds after which profiling stops, None to profile until bot stops
+        """
+        self.output_fpath = output_fpath
+        self.interval = interval
+        self.report_every = report_every
+        self.top_n = top_n
+        self.duration = duration
+        self.stacks = Counter()
+        self.stages = Counter()
+        self.terminal_times = Counter()
+        self.terminal_calls = Counter()
+        self.n_iterations = 0
+        self.iteration_time = 0.0
+        self.max_iteration_time = 0.0
+        self.lock = threading.Lock()
+        self.in_iteration = threading.Event()
+        self.stopped = threading.Event()
+        self.target_thread_id = None
+        self.start_time = None
+        self.iteration_start_time = None
+
+    def start(self):
+        """
+        Start profiling iterations of calling thread
+        """
+        self.target_thread_id = threading.get_ident()
+        self.start_time = time.perf_counter()
+        threading.Thread(target=self._sample_loop, name='iteration-profiler', daemon=True).start()
+        self.begin_iteration()
+        logger.info(f"Profiling strategy loop iterations every {self.interval * 1000:.1f}ms, writing stacks to {self.output_fpath}")
+
+    def stop(self):
+        """
+        Stop sampling and write collected stacks
+        """
+        if self.stopped.is_set():
+            return
+        self.stopped.set()
+        self.in_iteration.set()
+        if self.n_iterations % self.report_every:
+            self.report()
+        logger.info("Stopped profiling strategy loop iterations")
+
+    def begin_iteration(self):
+        if self.stopped.is_set():
+            return
+        self.iteration_start_time = time.perf_counter()
+        self.in_iteration.set()
+
+    def end_iteration(self):
+        if self.stopped.is_set() or self.iteration_start_time is None:
+            return
+        self.in_iteration.clear()
+        iteration_time = time.perf_counter() - self.iteration_start_time
+        with self.lock:
+            self.n_iterations += 1
+            self.iteration_time += iteration_time
+            self.max_iteration_time = max(self.max_iteration_time, iteration_time)
+        if self.n_iterations % self.report_every == 0:
+            self.report()
+        if self.duration is not None and time.perf_counter() - self.start_time >= self.duration:
+            self.stop()
+
+    def add_terminal_time(self, call_name, call_time):
+        if self.in_iteration.is_set() and not self.stopped.is_set():
+            with self.lock:
+                self.terminal_times[call_name] += call_time
+                self.terminal_calls[call_name] += 1
+
+    def _sample_loop(self):
+        while not self.stopped.is_set():
+            # Block while trading thread is sleeping between iterations
+            self.in_iteration.wait()
+            if self.stopped.is_set():
+                break
+            frame = sys._current_frames().get(self.target_thread_id)
+            if frame is not None:
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_filename}:{code.co_name}")
+                    frame = frame.f_back
+                stage = classify_stack(stack)
+                collapsed = ';'.join([stage] + [format_frame(item) for item in reversed(stack)])
+                with self.lock:
+                    self.stacks[collapsed] += 1
+                    self.stages[stage] += 1
+            time.sleep(self.interval)
+
+    def report(self):
+        """
+        Log summary of stages and top stacks, and write collapsed stacks to output file
+        """
+        with self.lock:
+            stacks = Counter(self.stacks)
+            stages = Counter(self.stages)
+            terminal_times = Counter(self.terminal_times)
+            terminal_calls = Counter(self.terminal_calls)
+            n_iterations = self.n_iterations
+            iteration_time = self.iteration_time
+            max_iteration_time = self.max_iteration_time
+        if n_iterations == 0:
+            return
+
+        n_samples = max(sum(stages.values()), 1)
+        lines = [f"Profile after {n_iterations} iterations: mean iteration time: {iteration_time / n_iterations * 1000:.2f}ms, "
+                 f"max iteration time: {max_iteration_time * 1000:.2f}ms, samples: {n_samples}"]
+        for stage, count in stages.most_common():
+            lines.append(f"  stage {stage:<17} {count / n_samples * 100:6.2f}% ~{count * self.interval / n_iterations * 1000:.2f}ms/iteration")
+        for call_name, call_time in terminal_times.most_common():
+            lines.append(f"  terminal {call_name:<25} calls: {terminal_calls[call_name]:<8} mean: {call_time / terminal_calls[call_name] * 1000:.2f}ms")
+        for collapsed, count in stacks.most_common(self.top_n):
+            lines.append(f"  {count / n_samples * 100:6.2f}% {' <- '.join(reversed(collapsed.split(';')[-3:]))}")
+        logger.info('\n'.join(lines))
+
+        with open(self.output_fpath, 'w') as f:
+            for collapsed, count in stacks.items():
+                f.write(f"{collapsed} {count}\n")
+
+
+def format_frame(frame_name):
+    """
+    Shorten frame name to file name and function name
+    """
+    fpath, _, function_name = frame_name.rpartition(':')
+    return f"{os.path.basename(fpath)}:{function_name}"
+
+def classify_stack(stack):
+    """
+    Stage sampled stack belongs to
+    args:
+        stack: Frame names of sampled stack from innermost to outermost frame
+    returns:
+        Stage name
+    """
+    for stage, patterns in STAGE_RULES:
+        for frame_name in stack:
+            if any(pattern in frame_name for pattern in patterns):
+                return stage
+    return 'strategy'
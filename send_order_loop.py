@@ -1,19 +1,19 @@
-import MetaTrader5 as mt5
-from strategy import RSI_strategy
-from utils import read_config
-from mt5_interface import initialize_mt5, send_order
-from time import sleep
+from terminal import use_terminal
+from concurrent.futures import ThreadPoolExecutor
+import time
+import random
 import sys
 import logging
 from datetime import datetime
 import os
+import argparse
 
 os.makedirs("logs", exist_ok=True)
 
 curr_dt = datetime.now().strftime(f"%Y_%m_%d")
 logging.basicConfig(
-     filename=f'logs/rsi_trading_bot_{curr_dt}.log',
-     level=logging.INFO, 
+     filename=f'logs/order_load_test_{curr_dt}.log',
+     level=logging.INFO,
      format= '[%(asctime)s] {%(pathname)s:%(lineno)d} %(levelname)s - %(message)s',
      datefmt='%H:%M:%S'
  )
@@ -30,60 +30,163 @@ logging.getLogger(__name__).addHandler(console)
 logger = logging.getLogger(__name__)
 
 
-def send_order_loop_btc(symbol, lot_size):
-    # Get the current market price
-    signal = mt5.ORDER_TYPE_BUY
-    tick = mt5.symbol_info_tick(symbol)
-    print(tick)
-    # price = tick.bid if signal == mt5.ORDER_TYPE_BUY else tick.ask
-    price = tick.ask if signal == mt5.ORDER_TYPE_BUY else tick.bid
-    ask_price = tick.ask
-    bid_price = tick.bid
-
-    # Set the stop loss and take profit levels
-    # multiplication factor is 100 only for BTCUSDm or ETHUSD pairs
-    stop_loss = bid_price - 100 * mt5.symbol_info(symbol).point * 20
-    take_profit = ask_price + 100 * mt5.symbol_info(symbol).point * 50
-    
-    logger.info(f"Current price: {price}, Stop loss: {stop_loss}, take profit: {take_profit}")
-    order_request = {
-        'action': mt5.TRADE_ACTION_DEAL,
-        'symbol': symbol,
-        'volume': lot_size,
-        'type': signal,
-        'price': price,    
-        'sl': stop_loss,
-        'tp': take_profit,
-        'magic': 123456,
-        'comment': f'Trading_Bot_{symbol}',
-        "type_time": mt5.ORDER_TIME_GTC, 
-        "type_filling": mt5.ORDER_FILLING_FOK, 
-    }  
-    response = mt5.order_send(order_request)
-    logger.debug(f"Sending order request: {order_request}, response: {str(response)}")
+def parse_symbol_mix(symbol_mix):
+    """
+    Parse symbol mix in format of SYMBOL:WEIGHT,SYMBOL:WEIGHT e.g. BTCUSDm:3,USDJPYm:1
+    args:
+        symbol_mix: Symbol mix string
+    returns:
+        symbols: List of symbols
+        weights: Relative share of orders for each symbol
+    """
+    symbols, weights = [], []
+    for item in symbol_mix.split(','):
+        symbol, _, weight = item.partition(':')
+        symbols.append(symbol.strip())
+        weights.append(float(weight) if weight else 1.0)
+    return symbols, weights
+
+def percentile(values, pct):
+    """
+    Nearest rank percentile of values
+    args:
+        values: Sorted list of values
+        pct: Percentile between 0 and 100
+    returns:
+        Percentile value or 0 if there are no values
+    """
+    if not values:
+        return 0.0
+    index = min(max(int(round(pct / 100 * len(values) + 0.5)) - 1, 0), len(values) - 1)
+    return values[index]
+
+def send_timed_order(place_order, done_retcode, symbol, signal, lot_size, scheduled_time, sl_margin, tp_margin):
+    """
+    Place single order through order manager and measure its timings
+    args:
+        place_order: Order manager place order function
+        done_retcode: Return code of successfully executed order
+        symbol: Symbol to be traded
+        signal: Buy/Sell order type
+        lot_size: Lot size for order
+        scheduled_time: Time at which order was due to be sent as per target rate (perf counter)
+        sl_margin: Stop loss margin in points
+        tp_margin: Take profit margin in points
+    returns:
+        symbol, queueing delay, latency, success flag and completion time
+    """
+    start_time = time.perf_counter()
+    try:
+        result = place_order(symbol, signal, lot_size, SL_MARGIN=sl_margin, TP_MARGIN=tp_margin, comment='Load test')
+        success = result is not None and result.retcode == done_retcode
+    except Exception as ex:
+        logger.debug(f"Order for symbol: {symbol} failed with error: {ex}")
+        success = False
+    end_time = time.perf_counter()
+    return symbol, start_time - scheduled_time, end_time - start_time, success, end_time
+
+def run_load(terminal, symbols, weights, n_orders, rate, concurrency, lot_size, sl_margin, tp_margin, seed=0):
+    """
+    Send orders at target rate using given no. of concurrent senders
+    args:
+        terminal: Terminal orders are sent to
+        symbols: Symbols to be traded
+        weights: Relative share of orders for each symbol
+        n_orders: No. of orders to be sent
+        rate: Target orders per second, 0 to send all orders at once
+        concurrency: No. of orders in flight at the same time
+        lot_size: Lot size for each order
+        sl_margin: Stop loss margin in points
+        tp_margin: Take profit margin in points
+        seed: Seed for symbol and side selection
+    returns:
+        Load test report
+    """
+    from order_manager import place_order
+
+    rng = random.Random(seed)
+    futures = []
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        start_time = time.perf_counter()
+        for index in range(n_orders):
+            # Open loop schedule so that slow orders show up as queueing delay instead of lowering the rate
+            scheduled_time = start_time + index / rate if rate > 0 else start_time
+            wait_time = scheduled_time - time.perf_counter()
+            if wait_time > 0:
+                time.sleep(wait_time)
+            symbol = rng.choices(symbols, weights)[0]
+            signal = terminal.ORDER_TYPE_BUY if rng.random() < 0.5 else terminal.ORDER_TYPE_SELL
+            futures.append(executor.submit(send_timed_order, place_order, terminal.TRADE_RETCODE_DONE, symbol, signal,
+                                           lot_size, scheduled_time, sl_margin, tp_margin))
+        results = [future.result() for future in futures]
+
+    elapsed = max(result[4] for result in results) - start_time if results else 0.0
+    latencies = sorted(result[2] for result in results)
+    queue_delays = sorted(result[1] for result in results)
+    n_errors = sum(1 for result in results if not result[3])
+    return {
+        'orders': len(results),
+        'target_rate': rate,
+        'concurrency': concurrency,
+        'throughput': len(results) / elapsed if elapsed > 0 else 0.0,
+        'error_rate': n_errors / len(results) if results else 0.0,
+        'latency_p50_ms': percentile(latencies, 50) * 1000,
+        'latency_p90_ms': percentile(latencies, 90) * 1000,
+        'latency_p99_ms': percentile(latencies, 99) * 1000,
+        'latency_max_ms': (latencies[-1] if latencies else 0.0) * 1000,
+        'queue_p50_ms': percentile(queue_delays, 50) * 1000,
+        'queue_p99_ms': percentile(queue_delays, 99) * 1000,
+    }
+
+def print_reports(reports):
+    """
+    Print load test reports as table
+    """
+    columns = ['orders', 'target_rate', 'concurrency', 'throughput', 'error_rate', 'latency_p50_ms', 'latency_p90_ms',
+               'latency_p99_ms', 'latency_max_ms', 'queue_p50_ms', 'queue_p99_ms']
+    print(' '.join(f"{column:>14}" for column in columns))
+    for report in reports:
+        print(' '.join(f"{report[column]:>14.2f}" if isinstance(report[column], float) else f"{report[column]:>14}" for column in columns))
 
 
 if __name__ == "__main__":
-    symbol = 'BTCUSDm'
-    timeframe = mt5.TIMEFRAME_M1
-    RSI_period = 14
-    RSI_upper = 70
-    RSI_lower = 30
-    lot_size = 0.01
-    config_data = read_config()
-    init_status = initialize_mt5(config_data['credentials'])
-    if not init_status:
-        logger.error("Initialization failed!!!")
-        sys.exit(0)
+    parser = argparse.ArgumentParser(description='Order throughput load test')
+    parser.add_argument('--config', help='Configuration file of live account. Stand-in terminal is used when not given')
+    parser.add_argument('--symbols', default='BTCUSDm', help='Symbol mix e.g. BTCUSDm:3,USDJPYm:1')
+    parser.add_argument('--rates', default='10,50,0', help='Comma separated target orders per second, 0 for as fast as possible')
+    parser.add_argument('--concurrency', default='1,4', help='Comma separated no. of concurrent order senders')
+    parser.add_argument('--orders', type=int, default=200, help='No. of orders per run')
+    parser.add_argument('--lot-size', type=float, default=0.01, help='Lot size for each order')
+    parser.add_argument('--sl-margin', type=int, default=20, help='Stop loss margin in points')
+    parser.add_argument('--tp-margin', type=int, default=50, help='Take profit margin in points')
+    parser.add_argument('--latency-ms', type=float, default=5.0, help='Order latency of stand-in terminal')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of orders rejected by stand-in terminal')
+    args = parser.parse_args()
+
+    if args.config:
+        from utils import read_config
+        from mt5_interface import initialize_mt5
+        logger.warning(f"Sending real orders to account from {args.config}")
+        config_data = read_config(args.config)
+        init_status = initialize_mt5(config_data['credentials'])
+        if not init_status:
+            logger.error("Initialization failed!!!")
+            sys.exit(0)
+        else:
+            logger.info("Initialization successful!!")
+        import MetaTrader5 as terminal
     else:
-        logger.info("Initialization successful!!")
-
-    # Send 10 orders for current pair BTCUSDm 
-    limit = 50
-    index = 0
-    while True:
-        if index > limit:
-            break
-        index += 1 
-        send_order_loop_btc(symbol, lot_size)
-        #sleep(5)
\ No newline at end of file
+        from sim_terminal import SimTerminal
+
+    symbols, weights = parse_symbol_mix(args.symbols)
+    reports = []
+    for rate in [float(rate) for rate in args.rates.split(',')]:
+        for concurrency in [int(concurrency) for concurrency in args.concurrency.split(',')]:
+            if not args.config:
+                # Fresh stand-in for every run so that positions opened by previous runs don't skew its timings
+                terminal = SimTerminal(order_latency=args.latency_ms / 1000, error_rate=args.error_rate)
+                use_terminal(terminal)
+            logger.info(f"Sending {args.orders} orders for symbols: {symbols} at rate: {rate}/s with concurrency: {concurrency}")
+            reports.append(run_load(terminal, symbols, weights, args.orders, rate, concurrency, args.lot_size,
+                                    args.sl_margin, args.tp_margin))
+    print_reports(reports)
@@ -0,0 +1,101 @@
+import logging
+from collections import namedtuple, Counter
+from utils import timeframe_seconds
+from clock import get_clock
+
+logger = logging.getLogger(__name__)
+
+# Trading signal along with bar it was computed from
+#   order_type: mt5.ORDER_TYPE_BUY or mt5.ORDER_TYPE_SELL
+#   bar_time: Open time of latest bar used to compute signal (terminal server time, seconds), None if unknown
+#   price: Reference price i.e. close of latest bar when signal was computed, which is a bid price, None if unknown
+#   timeframe: Timeframe of bars in meta trader format
+#   signal_time: Local clock time when signal was computed from freshly fetched bars (seconds)
+Signal = namedtuple('Signal', ['order_type', 'bar_time', 'price', 'timeframe', 'signal_time'])
+
+# Default max price movement between signal and order submission in points
+DEFAULT_MAX_DEVIATION_PIPS = 10
+
+# Number of signals accepted or dropped by the guard
+signal_counters = Counter()
+
+
+def make_signal(order_type, rates_frame, timeframe):
+    """
+    Attach latest bar timestamp and reference price to signal
+    args:
+        order_type: Buy/Sell order type or None if no signal is generated
+        rates_frame: Rates dataframe used to compute signal
+        timeframe: Timeframe of rates
+    return:
+        Signal or None if order type is None
+    """
+    if order_type is None:
+        return None
+    return Signal(order_type, int(rates_frame['time'].values[-1]), float(rates_frame['close'].values[-1]), timeframe,
+                  get_clock().time())
+
+def order_type_of(signal):
+    """
+    Order type for signal which can either be Signal or plain mt5 order type
+    """
+    return signal.order_type if isinstance(signal, Signal) else signal
+
+def signal_deadline_secs(timeframe):
+    """
+    Default deadline for signal i.e. signal is valid for the duration of a bar
+    args:
+        timeframe: Timeframe in meta trader format
+    return:
+        Max allowed age in seconds of signal and of bars it was computed on
+    """
+    return timeframe_seconds(timeframe)
+
+def check_signal(signal, tick, point, price, multiplier=1, signal_deadline=None, max_deviation_pips=None):
+    """
+    Check whether signal is still fresh enough to be submitted at current price.
+    Tick already fetched for pricing the order is used so no additional terminal call is made.
+    args:
+        signal: Signal to be checked. Plain order types carry no bar info and are always accepted
+        tick: Latest tick for signal symbol
+        point: Symbol point size
+        price: Price at which order would be submitted
+        multiplier: Point multiplier for symbol
+        signal_deadline: Max seconds since signal was computed and since latest bar it was computed on has closed
+                         (defaults to bar duration)
+        max_deviation_pips: Max allowed movement of bid price since signal in points
+    return:
+        True if order should be submitted else False
+    """
+    if not isinstance(signal, Signal):
+        return True
+    if signal_deadline is None:
+        signal_deadline = signal_deadline_secs(signal.timeframe)
+    if max_deviation_pips is None:
+        max_deviation_pips = DEFAULT_MAX_DEVIATION_PIPS
+
+    # Bars fetched after a stall or reconnect may lag behind. Bar time and tick time are both in terminal server time
+    bars_age = tick.time - (signal.bar_time + timeframe_seconds(signal.timeframe)) if signal.bar_time is not None else 0
+    if bars_age > signal_deadline:
+        signal_counters['stale_bars'] += 1
+        logger.warning(f"Dropping signal computed on stale bars: {signal}, latest bar closed {bars_age}s before tick > deadline: {signal_deadline}s. Signal counters: {dict(signal_counters)}")
+        return False
+
+    # Signals may also wait before submission e.g. when fanned out to accounts
+    signal_age = get_clock().time() - signal.signal_time
+    if signal_age > signal_deadline:
+        signal_counters['expired'] += 1
+        logger.warning(f"Dropping stale signal: {signal}, age: {signal_age:.1f}s > deadline: {signal_deadline}s. Signal counters: {dict(signal_counters)}")
+        return False
+
+    # Reference price is a bid price, so bid is compared for both directions to keep spread out of deviation
+    deviation = abs(tick.bid - signal.price) if signal.price is not None else 0.0
+    max_deviation = max_deviation_pips * point * multiplier
+    if deviation > max_deviation:
+        signal_counters['deviated'] += 1
+        logger.warning(f"Dropping signal: {signal}, bid moved to {tick.bid} by {deviation} > {max_deviation}. Signal counters: {dict(signal_counters)}")
+        return False
+
+    signal_counters['accepted'] += 1
+    logger.info(f"Re-pricing signal from reference price: {signal.price} to {price}, signal age: {signal_age:.1f}s")
+    return True
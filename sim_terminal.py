@@ -0,0 +1,363 @@
+import time
+import random
+import threading
+from datetime import datetime
+from collections import namedtuple
+import numpy as np
+
+# Stand-in for MetaTrader5 terminal used by load tests and simulations. Exposes subset of MetaTrader5
+# module API used by the bot and serves random walk prices so that no live account is needed.
+
+Tick = namedtuple('Tick', ['time', 'bid', 'ask', 'last', 'volume', 'time_msc', 'flags', 'volume_real'])
+SymbolInfo = namedtuple('SymbolInfo', ['name', 'point', 'digits', 'spread', 'trade_contract_size', 'volume_min',
+                                       'volume_max', 'volume_step', 'currency_base', 'currency_profit'])
+TradePosition = namedtuple('TradePosition', ['ticket', 'time', 'time_msc', 'type', 'magic', 'identifier', 'volume',
+                                             'price_open', 'sl', 'tp', 'price_current', 'profit', 'symbol', 'comment'])
+TradeDeal = namedtuple('TradeDeal', ['ticket', 'order', 'time', 'time_msc', 'type', 'entry', 'magic', 'position_id',
+                                     'volume', 'price', 'profit', 'symbol', 'comment'])
+AccountInfo = namedtuple('AccountInfo', ['login', 'balance', 'equity', 'profit', 'currency', 'leverage'])
+OrderSendResult = namedtuple('OrderSendResult', ['retcode', 'deal', 'order', 'volume', 'price', 'bid', 'ask', 'comment',
+                                                 'request_id', 'retcode_external', 'request'])
+
+RATES_DTYPE = np.dtype([('time', '<i8'), ('open', '<f8'), ('high', '<f8'), ('low', '<f8'), ('close', '<f8'),
+                        ('tick_volume', '<u8'), ('spread', '<i4'), ('real_volume', '<u8')])
+
+# Start price, digits and spread in points of symbols known to stand-in terminal
+DEFAULT_SYMBOLS = {
+    'USDJPYm': (150.0, 3, 10),
+    'EURUSDm': (1.08, 5, 10),
+    'GBPUSDm': (1.27, 5, 12),
+    'BTCUSDm': (60000.0, 2, 1500),
+    'ETHUSDm': (3000.0, 2, 150),
+}
+
+# No. of M1 bars generated when symbol is first used
+INITIAL_HISTORY_BARS = 1000
+
+# Max no. of M1 bars kept per symbol
+MAX_HISTORY_BARS = 100000
+
+
+class SymbolFeed:
+    """
+    Random walk M1 bars for a single symbol
+    """
+    def __init__(self, name, price, digits, spread, seed):
+        self.name = name
+        self.digits = digits
+        self.point = 10 ** -digits
+        self.spread = spread
+        # Per minute volatility of roughly 2 bps
+        self.volatility = price * 0.0002
+        self.rng = random.Random(f"{seed}:{name}")
+        # M1 bars as [time, open, high, low, close, tick_volume]
+        self.bars = []
+        self.start_price = price
+
+    def _new_bar(self, bar_time, open_price):
+        close_price = open_price + self.rng.gauss(0, self.volatility)
+        high = max(open_price, close_price) + abs(self.rng.gauss(0, self.volatility / 2))
+        low = min(open_price, close_price) - abs(self.rng.gauss(0, self.volatility / 2))
+        return [bar_time, open_price, high, low, close_price, self.rng.randint(20, 200)]
+
+    def advance(self, now):
+        """
+        Generate bars up to the bar which is currently forming
+        """
+        curr_bar_time = int(now // 60) * 60
+        if not self.bars:
+            bar_time = curr_bar_time - INITIAL_HISTORY_BARS * 60
+            price = self.start_price
+            while bar_time <= curr_bar_time:
+                self.bars.append(self._new_bar(bar_time, price))
+                price = self.bars[-1][4]
+                bar_time += 60
+        while self.bars[-1][0] < curr_bar_time:
+            self.bars.append(self._new_bar(self.bars[-1][0] + 60, self.bars[-1][4]))
+        if len(self.bars) > MAX_HISTORY_BARS:
+            del self.bars[:len(self.bars) - MAX_HISTORY_BARS]
+
+    def prepend_history(self, n_bars):
+        """
+        Extend history backwards by given no. of M1 bars
+        """
+        rng = random.Random(f"{self.name}:{self.bars[0][0]}")
+        bar_time, close_price = self.bars[0][0], self.bars[0][1]
+        older_bars = []
+        for _ in range(n_bars):
+            bar_time -= 60
+            open_price = close_price - rng.gauss(0, self.volatility)
+            older_bars.append([bar_time, open_price, max(open_price, close_price), min(open_price, close_price), close_price, rng.randint(20, 200)])
+            close_price = open_price
+        self.bars[:0] = older_bars[::-1]
+
+    def price(self, now):
+        """
+        Current bid price i.e. forming bar interpolated from its open to its close
+        """
+        bar = self.bars[-1]
+        fraction = min(max((now - bar[0]) / 60, 0), 1)
+        return round(bar[1] + (bar[4] - bar[1]) * fraction, self.digits)
+
+    def rates(self, timeframe_secs, start_pos, count, now):
+        """
+        Bars for timeframe aggregated from M1 bars, ordered from oldest to newest
+        """
+        n_minutes = (start_pos + count + 1) * timeframe_secs // 60
+        if len(self.bars) < n_minutes:
+            self.prepend_history(n_minutes - len(self.bars))
+        price = self.price(now)
+        rows = []
+        for bar_time, open_price, high, low, close_price, tick_volume in self.bars[-n_minutes:]:
+            if bar_time == self.bars[-1][0]:
+                # Forming bar has only traded up to current price
+                high, low, close_price = max(open_price, price), min(open_price, price), price
+            group_time = bar_time - bar_time % timeframe_secs
+            if rows and rows[-1][0] == group_time:
+                row = rows[-1]
+                row[2] = max(row[2], high)
+                row[3] = min(row[3], low)
+                row[4] = close_price
+                row[5] += tick_volume
+            else:
+                rows.append([group_time, open_price, high, low, close_price, tick_volume])
+        rows = rows[max(len(rows) - start_pos - count, 0):len(rows) - start_pos]
+        return np.array([(row[0], row[1], row[2], row[3], row[4], row[5], self.spread, 0) for row in rows], dtype=RATES_DTYPE)
+
+
+class SimTerminal:
+    """
+    Local stand-in terminal exposing the MetaTrader5 module API. Install it using terminal.use_terminal
+    """
+    ORDER_TYPE_BUY = 0
+    ORDER_TYPE_SELL = 1
+    POSITION_TYPE_BUY = 0
+    POSITION_TYPE_SELL = 1
+    DEAL_TYPE_BUY = 0
+    DEAL_TYPE_SELL = 1
+    DEAL_ENTRY_IN = 0
+    DEAL_ENTRY_OUT = 1
+    TRADE_ACTION_DEAL = 1
+    ORDER_TIME_GTC = 0
+    ORDER_FILLING_FOK = 0
+    ORDER_FILLING_IOC = 1
+    TRADE_RETCODE_REJECT = 10006
+    TRADE_RETCODE_DONE = 10009
+    TRADE_RETCODE_INVALID = 10013
+    TIMEFRAME_M1 = 1
+    TIMEFRAME_M5 = 5
+    TIMEFRAME_M15 = 15
+    TIMEFRAME_M30 = 30
+    TIMEFRAME_H1 = 16385
+    TIMEFRAME_H4 = 16388
+    TIMEFRAME_D1 = 16408
+    TIMEFRAME_W1 = 32769
+
+    TIMEFRAME_SECONDS = {1: 60, 5: 300, 15: 900, 30: 1800, 16385: 3600, 16388: 4 * 3600, 16408: 24 * 3600, 32769: 7 * 24 * 3600}
+
+    def __init__(self, order_latency=0.0, error_rate=0.0, seed=0, time_fn=time.time):
+        """
+        args:
+            order_latency: Seconds taken by terminal to process order request
+            error_rate: Fraction of order requests rejected by terminal
+            seed: Seed for random walk prices and rejections
+            time_fn: Function returning current time in seconds since epoch
+        """
+        self.order_latency = order_latency
+        self.error_rate = error_rate
+        self.seed = seed
+        self.time_fn = time_fn
+        self.rng = random.Random(seed)
+        self.lock = threading.RLock()
+        self.feeds = {}
+        self.positions = {}
+        # Open positions per symbol, and per symbol the band of bid/ask prices within which none of their stops
+        # are hit, so that quotes only scan positions of their symbol when price leaves the band
+        self.symbol_positions = {}
+        self.stop_bands = {}
+        self.deals = []
+        self.next_ticket = 1
+
+    def _feed(self, symbol):
+        feed = self.feeds.get(symbol)
+        if feed is None:
+            price, digits, spread = DEFAULT_SYMBOLS.get(symbol, (1.0, 5, 10))
+            feed = self.feeds[symbol] = SymbolFeed(symbol, price, digits, spread, self.seed)
+        feed.advance(self.time_fn())
+        return feed
+
+    def _quote(self, symbol):
+        feed = self._feed(symbol)
+        bid = feed.price(self.time_fn())
+        ask = round(bid + feed.spread * feed.point, feed.digits)
+        self._check_stops(symbol, bid, ask)
+        return feed, bid, ask
+
+    def _stop_levels(self, position):
+        """
+        Prices at or below and at or above which stop loss or take profit of position is hit
+        """
+        low, high = (position['sl'], position['tp']) if position['type'] == self.POSITION_TYPE_BUY else (position['tp'], position['sl'])
+        return low or -float('inf'), high or float('inf')
+
+    def _add_position(self, position):
+        self.positions[position['ticket']] = position
+        self.symbol_positions.setdefault(position['symbol'], {})[position['ticket']] = position
+        band = self.stop_bands.get(position['symbol'])
+        if band is not None:
+            low, high = self._stop_levels(position)
+            self.stop_bands[position['symbol']] = (max(band[0], low), min(band[1], high))
+
+    def _check_stops(self, symbol, bid, ask):
+        """
+        Close positions of symbol whose stop loss or take profit has been hit
+        """
+        positions = self.symbol_positions.get(symbol)
+        if not positions:
+            return
+        band = self.stop_bands.get(symbol)
+        if band is None:
+            levels = [self._stop_levels(position) for position in positions.values()]
+            band = self.stop_bands[symbol] = (max(low for low, _ in levels), min(high for _, high in levels))
+        # Bid is below ask, so no stop is hit while bid is above low and ask is below high end of band
+        if band[0] < bid and ask < band[1]:
+            return
+        for ticket, position in list(positions.items()):
+            if position['type'] == self.POSITION_TYPE_BUY:
+                price = bid
+                hit = (position['sl'] and price <= position['sl']) or (position['tp'] and price >= position['tp'])
+            else:
+                price = ask
+                hit = (position['sl'] and price >= position['sl']) or (position['tp'] and price <= position['tp'])
+            if hit:
+                self._close_position(ticket, price)
+
+    def _new_ticket(self):
+        ticket = self.next_ticket
+        self.next_ticket += 1
+        return ticket
+
+    def _add_deal(self, order, deal_type, entry, position, volume, price, profit):
+        now = self.time_fn()
+        deal = TradeDeal(self._new_ticket(), order, int(now), int(now * 1000), deal_type, entry, position['magic'],
+                         position['ticket'], volume, price, profit, position['symbol'], position['comment'])
+        self.deals.append(deal)
+        return deal
+
+    def _profit(self, position, price):
+        direction = 1 if position['type'] == self.POSITION_TYPE_BUY else -1
+        contract_size = 100000 if self._feed(position['symbol']).digits in (3, 5) else 1
+        return round(direction * (price - position['price_open']) * position['volume'] * contract_size, 2)
+
+    def _close_position(self, ticket, price):
+        position = self.positions.pop(ticket)
+        del self.symbol_positions[position['symbol']][ticket]
+        self.stop_bands.pop(position['symbol'], None)
+        deal_type = self.DEAL_TYPE_SELL if position['type'] == self.POSITION_TYPE_BUY else self.DEAL_TYPE_BUY
+        return self._add_deal(self._new_ticket(), deal_type, self.DEAL_ENTRY_OUT, position, position['volume'], price,
+                              self._profit(position, price))
+
+    def initialize(self, *args, **kwargs):
+        return True
+
+    def shutdown(self):
+        return True
+
+    def last_error(self):
+        return (1, 'Success')
+
+    def account_info(self):
+        with self.lock:
+            profit = sum(position.profit for position in self.positions_get())
+            balance = 10000.0 + sum(deal.profit for deal in self.deals)
+            return AccountInfo(0, balance, balance + profit, profit, 'USD', 100)
+
+    def symbol_info(self, symbol):
+        with self.lock:
+            feed = self._feed(symbol)
+            contract_size = 100000 if feed.digits in (3, 5) else 1
+            return SymbolInfo(symbol, feed.point, feed.digits, feed.spread, contract_size, 0.01, 100.0, 0.01,
+                              symbol[:3], symbol[3:6])
+
+    def symbol_info_tick(self, symbol):
+        with self.lock:
+            _, bid, ask = self._quote(symbol)
+            now = self.time_fn()
+            return Tick(int(now), bid, ask, 0.0, 0, int(now * 1000), 6, 0.0)
+
+    def copy_rates_from_pos(self, symbol, timeframe, start_pos, count):
+        with self.lock:
+            feed, _, _ = self._quote(symbol)
+            return feed.rates(self.TIMEFRAME_SECONDS[timeframe], start_pos, count, self.time_fn())
+
+    def _position_tuple(self, position):
+        _, bid, ask = self._quote(position['symbol'])
+        price = bid if position['type'] == self.POSITION_TYPE_BUY else ask
+        return TradePosition(position['ticket'], position['time'], position['time'] * 1000, position['type'],
+                             position['magic'], position['ticket'], position['volume'], position['price_open'],
+                             position['sl'], position['tp'], price, self._profit(position, price),
+                             position['symbol'], position['comment'])
+
+    def positions_get(self, symbol=None, ticket=None, group=None):
+        with self.lock:
+            for position_symbol in [position_symbol for position_symbol, positions in self.symbol_positions.items() if positions]:
+                self._quote(position_symbol)
+            return tuple(self._position_tuple(position) for position in list(self.positions.values())
+                         if (symbol is None or position['symbol'] == symbol) and (ticket is None or position['ticket'] == ticket))
+
+    def positions_total(self):
+        return len(self.positions)
+
+    def orders_get(self, *args, **kwargs):
+        return ()
+
+    def history_deals_get(self, date_from, date_to, group=None, ticket=None, position=None):
+        date_from = date_from.timestamp() if isinstance(date_from, datetime) else date_from
+        date_to = date_to.timestamp() if isinstance(date_to, datetime) else date_to
+        with self.lock:
+            return tuple(deal for deal in self.deals
+                         if date_from <= deal.time <= date_to and (position is None or deal.position_id == position))
+
+    def order_send(self, request):
+        if self.order_latency:
+            # Terminal round-trip is always real time, even when bot runs on a virtual clock
+            time.sleep(self.order_latency)
+        with self.lock:
+            symbol = request['symbol']
+            feed, bid, ask = self._quote(symbol)
+            if request.get('action') != self.TRADE_ACTION_DEAL or request['type'] not in (self.ORDER_TYPE_BUY, self.ORDER_TYPE_SELL):
+                return OrderSendResult(self.TRADE_RETCODE_INVALID, 0, 0, 0.0, 0.0, bid, ask, 'Invalid request', 0, 0, request)
+            if self.rng.random() < self.error_rate:
+                return OrderSendResult(self.TRADE_RETCODE_REJECT, 0, 0, 0.0, 0.0, bid, ask, 'Request rejected', 0, 0, request)
+
+            price = ask if request['type'] == self.ORDER_TYPE_BUY else bid
+            order = self._new_ticket()
+            position_ticket = request.get('position')
+            if position_ticket:
+                if position_ticket not in self.positions:
+                    return OrderSendResult(self.TRADE_RETCODE_INVALID, 0, 0, 0.0, 0.0, bid, ask, 'Position not found', 0, 0, request)
+                deal = self._close_position(position_ticket, price)
+            else:
+                now = self.time_fn()
+                position = {
+                    'ticket': order, 'time': int(now), 'type': request['type'], 'magic': request.get('magic', 0),
+                    'volume': request['volume'], 'price_open': price, 'sl': request.get('sl', 0.0),
+                    'tp': request.get('tp', 0.0), 'symbol': symbol, 'comment': request.get('comment', ''),
+                }
+                self._add_position(position)
+                deal = self._add_deal(order, request['type'], self.DEAL_ENTRY_IN, position, request['volume'], price, 0.0)
+            return OrderSendResult(self.TRADE_RETCODE_DONE, deal.ticket, order, request['volume'], price, bid, ask,
+                                   'Request executed', 0, 0, request)
+
+    def Close(self, symbol, *, comment=None, ticket=None):
+        """
+        Close positions of symbol, or only position with given ticket
+        """
+        with self.lock:
+            positions = [position for position in self.symbol_positions.get(symbol, {}).values()
+                         if ticket is None or position['ticket'] == ticket]
+            for position in positions:
+                _, bid, ask = self._quote(symbol)
+                if position['ticket'] in self.positions:
+                    self._close_position(position['ticket'], bid if position['type'] == self.POSITION_TYPE_BUY else ask)
+            return len(positions) > 0
@@ -0,0 +1,77 @@
+import time
+import logging
+import tracemalloc
+from clock import get_clock
+
+logger = logging.getLogger(__name__)
+
+
+class SimulationMonitor:
+    """
+    Tracks strategy loop iterations while bot runs on a virtual clock and logs a summary for every simulated
+    period, so that trends in iteration cost, timing drift and memory show up over a long simulated run.
+    Timing drift is the simulated time loop iterations take beyond their sleep interval, which shifts when
+    iterations run relative to bar closes.
+    """
+    def __init__(self, report_every=60 * 60):
+        """
+        args:
+            report_every: Simulated seconds between two summaries
+        """
+        self.report_every = report_every
+        self.period_start = None
+        self.iteration_start_time = None
+        self.prev_iteration_time = None
+        self.prev_sleep_interval = None
+        self.reset_period()
+
+    def reset_period(self):
+        self.n_iterations = 0
+        self.iteration_cost = 0.0
+        self.max_iteration_cost = 0.0
+        self.drift = 0.0
+
+    def start(self):
+        tracemalloc.start()
+        self.period_start = get_clock().time()
+        self.begin_iteration()
+        logger.info(f"Simulating from {get_clock().now()}, reporting every {self.report_every}s of simulated time")
+
+    def begin_iteration(self):
+        self.iteration_start_time = time.perf_counter()
+
+    def end_iteration(self, sleep_interval):
+        """
+        args:
+            sleep_interval: Seconds loop sleeps before next iteration
+        """
+        now = get_clock().time()
+        iteration_cost = time.perf_counter() - self.iteration_start_time
+        self.n_iterations += 1
+        self.iteration_cost += iteration_cost
+        self.max_iteration_cost = max(self.max_iteration_cost, iteration_cost)
+        if self.prev_iteration_time is not None:
+            self.drift += now - self.prev_iteration_time - self.prev_sleep_interval
+        self.prev_iteration_time = now
+        self.prev_sleep_interval = sleep_interval
+        if now - self.period_start >= self.report_every:
+            self.report(now)
+
+    def report(self, now=None):
+        """
+        Log summary of current period and start next one
+        """
+        now = now or get_clock().time()
+        if self.n_iterations == 0:
+            return
+        current_memory, peak_memory = tracemalloc.get_traced_memory()
+        logger.info(f"Simulated {now - self.period_start:.0f}s until {get_clock().now()}: iterations: {self.n_iterations}, "
+                    f"mean iteration cost: {self.iteration_cost / self.n_iterations * 1000:.2f}ms, "
+                    f"max iteration cost: {self.max_iteration_cost * 1000:.2f}ms, timing drift: {self.drift:.3f}s, "
+                    f"memory: {current_memory / 2 ** 20:.1f}MiB (peak {peak_memory / 2 ** 20:.1f}MiB)")
+        self.period_start = now
+        self.reset_period()
+
+    def stop(self):
+        self.report()
+        tracemalloc.stop()
@@ -1,12 +1,10 @@
 import MetaTrader5 as mt5
 import pandas as pd
-import talib as ta
 import logging
-import sys
-from utils import read_config
-from mt5_interface import initialize_mt5, get_open_positions, cancel_orders
-from time import sleep
+from mt5_interface import get_open_positions, cancel_orders
 from strategy_impl import compute_aroon_values
+from signal_guard import make_signal
+# TA-Lib is imported by the strategies using it, so Aroon strategies start without loading it
 
 logger = logging.getLogger(__name__)
 
@@ -37,7 +35,7 @@ def Aroon_strategy_custom_threshold_close_orders(symbol, timeframe, window_size=
         # Check if ar_up_val has crossed buy exit threshold
         if ar_up_val >= up_line_buy_exit_thresh:            
             # Close buy open positions
-            positions_to_cancel = [(open_position[0], open_position[1]) for open_position in buy_open_positions]
+            positions_to_cancel = [(open_position[1], open_position[0]) for open_position in buy_open_positions]
             logger.info(f"AR up value: {ar_up_val} crossed up line buy exit threshold: {up_line_buy_exit_thresh}. Closing positions: {positions_to_cancel}")
             cancel_orders(positions_to_cancel)
 
@@ -45,7 +43,7 @@ def Aroon_strategy_custom_threshold_close_orders(symbol, timeframe, window_size=
         # Check if ar_down_val has crossed sell exit threshold
         if ar_down_val <= down_line_sell_exit_thresh:
             # Close sell open positions
-            positions_to_cancel = [(open_position[0], open_position[1]) for open_position in sell_open_positions]
+            positions_to_cancel = [(open_position[1], open_position[0]) for open_position in sell_open_positions]
             logger.info(f"AR down value: {ar_up_val} crossed down line sell exit threshold: {down_line_sell_exit_thresh}. Closing positions: {positions_to_cancel}")            
             cancel_orders(positions_to_cancel)
 
@@ -99,7 +97,7 @@ def Aroon_custom_threshold_based_exit_strategy(symbol, timeframe, ar_up_prev=Non
     # Copy back current values to prev values
     ar_up_prev = ar_up_val
     ar_down_prev = ar_down_val
-    return ar_up_prev, ar_down_prev, signal
+    return ar_up_prev, ar_down_prev, make_signal(signal, rates_frame, timeframe)
 
 def Aroon_strategy(symbol, timeframe, ar_up_prev=None, ar_down_prev=None, window_size=25):
     """ 
@@ -143,7 +141,7 @@ def Aroon_strategy(symbol, timeframe, ar_up_prev=None, ar_down_prev=None, window
     
     ar_up_prev = ar_up_val
     ar_down_prev = ar_down_val
-    return ar_up_prev, ar_down_prev, signal
+    return ar_up_prev, ar_down_prev, make_signal(signal, rates_frame, timeframe)
 
 
 def DXI_strategy(symbol, timeframe, prev_pos_di_val, prev_neg_di_val, RSI_period=5, ADX_THRESHOLD=25):
@@ -159,6 +157,7 @@ def DXI_strategy(symbol, timeframe, prev_pos_di_val, prev_neg_di_val, RSI_period
         curr_pos_di_val: Current positive di value
         curr_neg_di_val: Current negative di value
     """
+    import talib as ta
     # Get the historical data for the symbol and timeframe    
     rates = mt5.copy_rates_from_pos(symbol, timeframe, 0, 100)
 
@@ -204,7 +203,7 @@ def DXI_strategy(symbol, timeframe, prev_pos_di_val, prev_neg_di_val, RSI_period
     # Update values for pos di val and minus di val.
     prev_pos_di_val = plus_di_val
     prev_neg_di_val = minus_di_val
-    return prev_pos_di_val, prev_neg_di_val, order
+    return prev_pos_di_val, prev_neg_di_val, make_signal(order, rates_frame, timeframe)
     
 def ADX_RSI_strategy(symbol, timeframe, RSI_period, RSI_upper, RSI_lower, prev_rsi_val, ADX_THRESHOLD=35):
     """
@@ -220,6 +219,7 @@ def ADX_RSI_strategy(symbol, timeframe, RSI_period, RSI_upper, RSI_lower, prev_r
         prev_rsi_val: Updated rsi value
         signal: Buy/Sell signal if its generated or None
     """
+    import talib as ta
     # Get the historical data for the symbol and timeframe    
     rates = mt5.copy_rates_from_pos(symbol, timeframe, 0, 100)
 
@@ -256,7 +256,7 @@ def ADX_RSI_strategy(symbol, timeframe, RSI_period, RSI_upper, RSI_lower, prev_r
             if plus_di_val < minus_di_val:                
                 logger.info(f"Adx value: {adx_value} > Adx threshold: {ADX_THRESHOLD} & plus_di_val: {plus_di_val} < minus_di_val: {minus_di_val}")
                 logger.info("Sending buy order!!!")
-                return prev_rsi_val, mt5.ORDER_TYPE_BUY
+                return prev_rsi_val, make_signal(mt5.ORDER_TYPE_BUY, rates_frame, timeframe)
             else:
                 logger.info(f"plus_di_val: {plus_di_val} > minus_di_val: {minus_di_val}...Hence skipping order submission for buy case!!!")
 
@@ -269,7 +269,7 @@ def ADX_RSI_strategy(symbol, timeframe, RSI_period, RSI_upper, RSI_lower, prev_r
             if plus_di_val > minus_di_val:                
                 logger.info(f"Adx value: {adx_value} > Adx threshold: {ADX_THRESHOLD} & plus_di_val: {plus_di_val} > minus_di_val: {minus_di_val}")
                 logger.info("Sending sell order!!!")
-                return prev_rsi_val, mt5.ORDER_TYPE_SELL
+                return prev_rsi_val, make_signal(mt5.ORDER_TYPE_SELL, rates_frame, timeframe)
             else:
                 logger.info(f"plus_di_val : {plus_di_val} < minus_di_val: {minus_di_val}...Hence skipping order submission for sell case!!!!")
 
@@ -288,6 +288,7 @@ def RSI_strategy(symbol, timeframe, RSI_period, RSI_upper, RSI_lower, prev_rsi_v
         RSI_Lower: Rsi lower value
         prev_rsi_val: Previous rsi value
     """    
+    import talib as ta
     # Get the historical data for the symbol and timeframe    
     rates = mt5.copy_rates_from_pos(symbol, timeframe, 0, RSI_period+1)
 
@@ -304,11 +305,11 @@ def RSI_strategy(symbol, timeframe, RSI_period, RSI_upper, RSI_lower, prev_rsi_v
     if prev_rsi_val > RSI_upper and rsi_val < RSI_upper:
         logger.info(f"Sending sell order since {prev_rsi_val} > {RSI_upper} and current rsi val: {rsi_val} < {RSI_upper}")
         prev_rsi_val = rsi_val
-        return prev_rsi_val, mt5.ORDER_TYPE_SELL
+        return prev_rsi_val, make_signal(mt5.ORDER_TYPE_SELL, rates_frame, timeframe)
     elif prev_rsi_val < RSI_lower and rsi_val > RSI_lower:
         logger.info(f"Sending buy order since {rsi_val} > {RSI_lower} and prev rsi val: {prev_rsi_val} < {RSI_lower}")
         prev_rsi_val = rsi_val
-        return prev_rsi_val, mt5.ORDER_TYPE_BUY
+        return prev_rsi_val, make_signal(mt5.ORDER_TYPE_BUY, rates_frame, timeframe)
     else:
         prev_rsi_val = rsi_val
         return prev_rsi_val, None
@@ -324,6 +325,7 @@ def RSI_strategy_mean(symbol, timeframe, RSI_period, RSI_upper, RSI_lower, prev_
         RSI_Lower: Rsi lower value
         prev_rsi_val: Previous rsi value
     """
+    import talib as ta
 
     # Get the historical data for the symbol and timeframe    
     rates = mt5.copy_rates_from_pos(symbol, timeframe, 0, RSI_period+1)
@@ -345,11 +347,11 @@ def RSI_strategy_mean(symbol, timeframe, RSI_period, RSI_upper, RSI_lower, prev_
     if prev_rsi_val > RSI_upper and rsi_val < RSI_upper:
         logger.info(f"Sending sell order since prev rsi val: {prev_rsi_val} > {RSI_upper} and {rsi_val} < {RSI_upper}")
         prev_rsi_val = rsi_val
-        return prev_rsi_val, mt5.ORDER_TYPE_SELL
+        return prev_rsi_val, make_signal(mt5.ORDER_TYPE_SELL, rates_frame, timeframe)
     elif prev_rsi_val < RSI_lower and rsi_val > RSI_lower:
         logger.info(f"Sending buy order since prev rsi val: {prev_rsi_val} < {RSI_lower} and {rsi_val} > {RSI_lower}")
         prev_rsi_val = rsi_val
-        return prev_rsi_val, mt5.ORDER_TYPE_BUY
+        return prev_rsi_val, make_signal(mt5.ORDER_TYPE_BUY, rates_frame, timeframe)
     else:
         prev_rsi_val = rsi_val
         return prev_rsi_val, None
@@ -365,6 +367,7 @@ def RSI_strategy_ema(symbol, timeframe, RSI_period, RSI_upper, RSI_lower, prev_r
         RSI_Lower: Rsi lower value
         prev_rsi_val: Previous rsi value
     """
+    import talib as ta
 
     # Get the historical data for the symbol and timeframe    
     rates = mt5.copy_rates_from_pos(symbol, timeframe, 0, RSI_period+1)
@@ -384,24 +387,38 @@ def RSI_strategy_ema(symbol, timeframe, RSI_period, RSI_upper, RSI_lower, prev_r
     if prev_rsi_val > RSI_upper and rsi_val < RSI_upper:
         logger.info(f"Sending sell order since current rsi val: {rsi_val} > {RSI_upper} and prev_rsi_val: {prev_rsi_val} < {RSI_upper}")
         prev_rsi_val = rsi_val
-        return prev_rsi_val, mt5.ORDER_TYPE_SELL
+        return prev_rsi_val, make_signal(mt5.ORDER_TYPE_SELL, rates_frame, timeframe)
     elif prev_rsi_val < RSI_lower and rsi_val > RSI_lower:
         logger.info(f"Sending buy order since current rsi val: {rsi_val} > {RSI_lower} and prev_rsi_val: {prev_rsi_val} < {RSI_lower}")
         prev_rsi_val = rsi_val
-        return prev_rsi_val, mt5.ORDER_TYPE_BUY
+        return prev_rsi_val, make_signal(mt5.ORDER_TYPE_BUY, rates_frame, timeframe)
     else:
         prev_rsi_val = rsi_val
         return prev_rsi_val, None
         
-if __name__ == "__main__":    
+if __name__ == "__main__":
+    import sys
+    import argparse
+    from time import sleep
+    from utils import read_config, validate_config
+    from mt5_interface import initialize_mt5
+
+    parser = argparse.ArgumentParser(description='Print ADX RSI strategy values for USDJPYm')
+    parser.add_argument('config_file', help='Configuration file with credentials of terminal')
+    args = parser.parse_args()
     symbol = 'USDJPYm'
     timeframe = mt5.TIMEFRAME_M1
     RSI_period = 14
     RSI_upper = 70
     RSI_lower = 30
     lot_size = 0.5
-    config_data = read_config()
-    init_status = initialize_mt5(config_data)
+    config_data = read_config(args.config_file)
+    try:
+        validate_config(config_data)
+    except ValueError as ex:
+        logger.error(f"Invalid configuration file {args.config_file}: {ex}")
+        sys.exit(1)
+    init_status = initialize_mt5(config_data['credentials'])
     if not init_status:
         logger.error("Initialization failed!!!")
         sys.exit(0)
@@ -409,6 +426,6 @@ if __name__ == "__main__":
     # Continuously pull rates using mt5
     prev_rsi_val = None
     while True:        
-        prev_rsi_val, signal = ADX_RSI_strategy(symbol, timeframe, RSI_period, RSI_upper, RSI_lower, prev_rsi_val=None)
+        prev_rsi_val, signal = ADX_RSI_strategy(symbol, timeframe, RSI_period, RSI_upper, RSI_lower, prev_rsi_val=prev_rsi_val)
         print(f"Prev rsi val: {prev_rsi_val}")
-        sleep(5)
\ No newline at end of file
+        sleep(5)
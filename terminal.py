@@ -0,0 +1,20 @@
+import sys
+
+
+def use_terminal(terminal):
+    """
+    Route MetaTrader5 calls of bot modules to given terminal e.g. stand-in terminal for load tests.
+    Modules which are already imported get their `mt5` reference swapped while modules imported
+    afterwards pick terminal up via their `import MetaTrader5 as mt5`.
+    args:
+        terminal: Object exposing MetaTrader5 module API
+    returns:
+        previous: Terminal which was in use before or None
+    """
+    previous = sys.modules.get('MetaTrader5')
+    sys.modules['MetaTrader5'] = terminal
+    if previous is not None:
+        for module in list(sys.modules.values()):
+            if getattr(module, 'mt5', None) is previous:
+                module.mt5 = terminal
+    return previous
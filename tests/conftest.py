@@ -0,0 +1,21 @@
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sim_terminal import SimTerminal
+from terminal import use_terminal
+
+# Bot modules import MetaTrader5, tests run them against stand-in terminal instead
+use_terminal(SimTerminal())
+
+
+@pytest.fixture
+def bot(tmp_path_factory, monkeypatch):
+    """
+    Bot module, imported from a temporary working directory since it creates its logs directory on import
+    """
+    monkeypatch.chdir(tmp_path_factory.getbasetemp())
+    import bot
+    return bot
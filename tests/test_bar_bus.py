@@ -0,0 +1,92 @@
+import os
+import time
+import numpy as np
+import bar_bus
+from bar_bus import BarBusSegment, BarBusWriter, BarBusTerminal
+from sim_terminal import SimTerminal
+
+M1 = SimTerminal.TIMEFRAME_M1
+
+
+def test_bot_attaches_to_feeder_started_after_it(monkeypatch):
+    symbol = f"TEST{os.getpid()}"
+    terminal = SimTerminal()
+    bus = BarBusTerminal(terminal)
+    # No feeder yet, so bars come from terminal and attach is retried later
+    assert len(bus.copy_rates_from_pos(symbol, M1, 0, 10)) == 10
+    assert bus._readers.get((symbol, M1)) is None
+
+    rates = terminal.copy_rates_from_pos(symbol, M1, 0, 50)
+    writer = BarBusWriter(symbol, M1, capacity=50)
+    try:
+        writer.publish(rates)
+        monkeypatch.setattr(bar_bus, 'RETRY_MIN_SECS', 0)
+        bus._retries[(symbol, M1)] = (0.0, 0)
+        np.testing.assert_array_equal(bus.copy_rates_from_pos(symbol, M1, 1, 10), rates[-11:-1])
+        assert bus._readers[(symbol, M1)] is not None
+    finally:
+        writer.close()
+
+def test_restarted_feeder_reuses_segment():
+    symbol = f"TEST{os.getpid()}"
+    rates = SimTerminal().copy_rates_from_pos(symbol, M1, 0, 20)
+    writer = BarBusWriter(symbol, M1, capacity=20)
+    writer.publish(rates[:-1])
+    # Feeder is killed, leaving its segment behind
+    BarBusSegment.close(writer)
+    restarted_writer = BarBusWriter(symbol, M1, capacity=20)
+    try:
+        restarted_writer.publish(rates)
+        assert restarted_writer.header[bar_bus.VERSION] == 2
+        bus = BarBusTerminal(SimTerminal())
+        np.testing.assert_array_equal(bus.copy_rates_from_pos(symbol, M1, 0, 20), rates)
+    finally:
+        restarted_writer.close()
+
+
+class FallbackTerminal:
+    def __init__(self):
+        self.calls = []
+
+    def copy_rates_from_pos(self, *args):
+        self.calls.append(args)
+        return None
+
+
+def test_bars_overwritten_while_copied_are_not_used():
+    symbol = f"TEST{os.getpid()}"
+    rates = SimTerminal().copy_rates_from_pos(symbol, M1, 0, 20)
+    writer = BarBusWriter(symbol, M1, capacity=20, n_slots=4)
+    try:
+        writer.publish(rates)
+        terminal = FallbackTerminal()
+        bus = BarBusTerminal(terminal)
+        reader = bus._reader(symbol, M1)
+        read = reader.read
+
+        def read_while_writer_comes_around():
+            version, view = read()
+            writer.header[bar_bus.VERSION] = version + 3
+            return version, view
+        reader.read = read_while_writer_comes_around
+        assert bus.copy_rates_from_pos(symbol, M1, 0, 10) is None
+        assert terminal.calls == [(symbol, M1, 0, 10)]
+    finally:
+        writer.close()
+
+def test_unchanged_bars_keep_feed_live(monkeypatch):
+    symbol = f"TEST{os.getpid()}"
+    rates = SimTerminal().copy_rates_from_pos(symbol, M1, 0, 20)
+    writer = BarBusWriter(symbol, M1, capacity=20)
+    try:
+        writer.publish(rates)
+        bus = BarBusTerminal(SimTerminal())
+        reader = bus._reader(symbol, M1)
+        now = time.time()
+        monkeypatch.setattr(bar_bus.time, 'time', lambda: now + bar_bus.STALE_FEED_SECS + 1)
+        assert reader.is_stale()
+        assert not writer.publish(rates)
+        assert not reader.is_stale()
+        assert writer.header[bar_bus.VERSION] == 1
+    finally:
+        writer.close()
@@ -0,0 +1,79 @@
+import os
+import sys
+import subprocess
+import pytest
+
+CONFIG = {
+    'credentials': {'login': 1, 'password': 'password', 'server': 'server', 'mt5_exe_path': 'main/terminal64.exe'},
+    'trade_params': {'symbol': 'EURUSDm', 'lot_size': 0.01, 'timeframe': '1min', 'strategy': 'AROON', 'sleep_interval': 60},
+    'strategy_params': {},
+    'accounts': [{'credentials': {'login': 2, 'password': 'password', 'server': 'server', 'mt5_exe_path': 'account/terminal64.exe'},
+                  'lot_size': 0.1}],
+}
+
+
+@pytest.fixture
+def account_pools(monkeypatch):
+    """
+    Account pools started by bot, without starting worker processes
+    """
+    import account_pool
+
+    pools = []
+
+    class AccountPool:
+        def __init__(self, accounts):
+            pools.append(accounts)
+
+        def start(self):
+            return True
+    monkeypatch.setattr(account_pool, 'AccountPool', AccountPool)
+    return pools
+
+
+@pytest.mark.parametrize('argv', [['--replay', 'session.journal'], ['--simulate', '1'], ['--startup-only']])
+def test_accounts_are_not_used_without_live_trading(bot, account_pools, argv):
+    assert bot.start_account_pool(CONFIG, bot.parse_args(['config.json'] + argv)) is None
+    assert account_pools == []
+
+def test_accounts_are_used_when_trading(bot, account_pools):
+    assert bot.start_account_pool(CONFIG, bot.parse_args(['config.json'])) is not None
+    assert account_pools == [CONFIG['accounts']]
+
+@pytest.mark.parametrize('argv', [['--record', 'session.journal', '--exit-manager'], ['--replay', 'session.journal', '--trade-db', 'trades.db'],
+                                  ['--record', 'session.journal', '--bar-bus'], ['--replay', 'session.journal', '--bar-bus']])
+def test_journal_conflicts_are_rejected(bot, argv):
+    with pytest.raises(SystemExit):
+        bot.parse_args(['config.json'] + argv)
+
+def test_simulate_runs_without_metatrader5_package(tmp_path):
+    # Bot runs in a fresh interpreter, where MetaTrader5 is only available as a package if it's installed
+    repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    config_fpath = os.path.join(repo_dir, 'config', 'config.json')
+    completed = subprocess.run([sys.executable, os.path.join(repo_dir, 'bot.py'), config_fpath, '--simulate', '0.01', '--no-reload'],
+                               cwd=tmp_path, capture_output=True, text=True, timeout=120)
+    assert completed.returncode == 0, completed.stderr
+    assert 'Simulation finished' in completed.stderr
+
+def test_exposure_check_does_not_list_positions(bot, monkeypatch):
+    from sim_terminal import SimTerminal
+    from exposure import ExposureTracker, ExposureTerminal
+
+    class OrderPathTerminal(SimTerminal):
+        def positions_get(self, *args, **kwargs):
+            raise AssertionError("Positions listed on order path")
+
+    terminal = OrderPathTerminal()
+    tracker = ExposureTracker()
+    exposure_terminal = ExposureTerminal(terminal, tracker)
+    exposure_terminal.symbol_info_tick('EURUSDm')
+    orders = []
+    monkeypatch.setattr(bot, 'mt5', exposure_terminal)
+    monkeypatch.setattr(bot, 'exposure_tracker', tracker)
+    monkeypatch.setattr(bot, 'place_order', lambda symbol, signal, lot_size, **kwargs: orders.append((symbol, signal, lot_size)))
+    trade_params = {'symbol': 'EURUSDm', 'lot_size': 1.0, 'max_currency_exposure': 150000}
+    bot.submit_order(trade_params, terminal.ORDER_TYPE_BUY)
+    # 1 lot is worth about 108000 USD, a second one would exceed limit
+    tracker.add_position(1, 'EURUSDm', 1, 1.0, 1.08)
+    bot.submit_order(trade_params, terminal.ORDER_TYPE_BUY)
+    assert orders == [('EURUSDm', terminal.ORDER_TYPE_BUY, 1.0)]
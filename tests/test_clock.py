@@ -0,0 +1,28 @@
+import time
+import threading
+from clock import VirtualClock, SimulationFinished
+
+START = 1_700_000_000.0
+
+
+def test_waiting_thread_is_parked_once_simulation_finished():
+    clock = VirtualClock(START, end_time=START + 60)
+    stopped = threading.Event()
+    n_wakes = []
+
+    def run():
+        while not clock.wait(stopped, 5):
+            n_wakes.append(clock.time())
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    try:
+        while True:
+            clock.sleep(10)
+    except SimulationFinished:
+        pass
+    # Thread doesn't spin while main thread is shutting down, but wakes up when stopped
+    time.sleep(0.2)
+    assert len(n_wakes) <= 12
+    stopped.set()
+    thread.join(timeout=5)
+    assert not thread.is_alive()
@@ -0,0 +1,92 @@
+import copy
+import json
+import os
+import pytest
+from config_watcher import ConfigWatcher
+
+CONFIG = {
+    'credentials': {'login': 1, 'password': 'password', 'server': 'server', 'mt5_exe_path': 'terminal64.exe'},
+    'trade_params': {'symbol': 'EURUSDm', 'lot_size': 0.01, 'timeframe': '1min', 'strategy': 'RSI', 'sleep_interval': 60},
+    'strategy_params': {'RSI': {'rsi_period': 14, 'rsi_lower_thresh': 30, 'rsi_upper_thresh': 70}},
+}
+
+
+def write_config(config_fpath, config_data, version):
+    with open(config_fpath, 'w') as f:
+        json.dump(config_data, f)
+    # Distinct modification time for every version, even within file system timestamp resolution
+    os.utime(config_fpath, ns=(version * 10 ** 9, version * 10 ** 9))
+
+@pytest.fixture
+def config_fpath(tmp_path):
+    config_fpath = tmp_path / 'config.json'
+    write_config(config_fpath, CONFIG, 1)
+    return config_fpath
+
+
+def test_unchanged_file_keeps_params(config_fpath):
+    watcher = ConfigWatcher(config_fpath, copy.deepcopy(CONFIG))
+    assert watcher.poll() == (CONFIG['trade_params'], CONFIG['strategy_params'])
+
+def test_changed_file_is_picked_up(config_fpath):
+    watcher = ConfigWatcher(config_fpath, copy.deepcopy(CONFIG))
+    new_config = copy.deepcopy(CONFIG)
+    new_config['trade_params']['sleep_interval'] = 5
+    new_config['strategy_params']['RSI']['rsi_upper_thresh'] = 80
+    write_config(config_fpath, new_config, 2)
+    trade_params, strategy_params = watcher.poll()
+    assert trade_params['sleep_interval'] == 5
+    assert strategy_params['RSI']['rsi_upper_thresh'] == 80
+
+@pytest.mark.parametrize('content', ['{"trade_params": ', json.dumps(dict(CONFIG, trade_params=dict(CONFIG['trade_params'], lot_size=True)))])
+def test_invalid_file_is_ignored(config_fpath, content):
+    watcher = ConfigWatcher(config_fpath, copy.deepcopy(CONFIG))
+    with open(config_fpath, 'w') as f:
+        f.write(content)
+    os.utime(config_fpath, ns=(2 * 10 ** 9, 2 * 10 ** 9))
+    assert watcher.poll() == (CONFIG['trade_params'], CONFIG['strategy_params'])
+    # Fixed file is picked up again
+    new_config = copy.deepcopy(CONFIG)
+    new_config['trade_params']['lot_size'] = 0.02
+    write_config(config_fpath, new_config, 3)
+    assert watcher.poll()[0]['lot_size'] == 0.02
+
+def test_restart_only_params_are_kept(config_fpath):
+    watcher = ConfigWatcher(config_fpath, copy.deepcopy(CONFIG))
+    new_config = copy.deepcopy(CONFIG)
+    new_config['trade_params'].update(symbol='GBPUSDm', strategy='AROON', timeframe='5min', lot_size=0.02)
+    new_config['credentials']['login'] = 2
+    new_config['accounts'] = [{'credentials': dict(CONFIG['credentials'], login=3, mt5_exe_path='other.exe'), 'lot_size': 0.1}]
+    merged = watcher._merge_restart_only_params(new_config)
+    assert {key: merged['trade_params'][key] for key in ('symbol', 'strategy', 'timeframe', 'lot_size')} == \
+        {'symbol': 'EURUSDm', 'strategy': 'RSI', 'timeframe': '1min', 'lot_size': 0.02}
+    assert merged['credentials'] == CONFIG['credentials']
+    assert merged['accounts'] == []
+    # File contents are not modified in place
+    assert new_config['trade_params']['symbol'] == 'GBPUSDm'
+
+def test_rsi_state_is_reset_when_period_changes(bot, config_fpath, monkeypatch):
+    import strategy
+
+    watcher = ConfigWatcher(config_fpath, copy.deepcopy(CONFIG))
+    calls = []
+
+    def rsi_strategy_mean(symbol, timeframe, rsi_period, rsi_upper, rsi_lower, prev_rsi_val):
+        calls.append((rsi_period, prev_rsi_val))
+        return 50.0, None
+
+    class Stop(BaseException):
+        pass
+
+    def end_iteration(sleep_interval):
+        if len(calls) == 2:
+            new_config = copy.deepcopy(CONFIG)
+            new_config['strategy_params']['RSI']['rsi_period'] = 10
+            write_config(config_fpath, new_config, 2)
+        elif len(calls) == 4:
+            raise Stop()
+    monkeypatch.setattr(strategy, 'RSI_strategy_mean', rsi_strategy_mean)
+    monkeypatch.setattr(bot, 'end_iteration', end_iteration)
+    with pytest.raises(Stop):
+        bot.rsi_strategy(CONFIG['trade_params'], CONFIG['strategy_params'], 1, watcher)
+    assert calls == [(14, None), (14, 50.0), (10, None), (10, 50.0)]
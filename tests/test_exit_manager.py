@@ -0,0 +1,124 @@
+import numpy as np
+import pytest
+from sim_terminal import SimTerminal, TradePosition, RATES_DTYPE
+from terminal import use_terminal
+from exit_manager import ExitManager, BOT_MAGIC, AROON_COMMENT
+
+NOW = 1_700_000_000
+POINT = 0.00001
+SPREAD = 20
+WINDOW_SIZE = 5
+
+
+class FixedTerminal(SimTerminal):
+    """
+    Stand-in terminal with given open positions and M1 bars, recording positions it was asked to close
+    """
+    def __init__(self):
+        super().__init__(time_fn=lambda: NOW)
+        self.open_positions = []
+        self.bar_lows = self.bar_highs = None
+        self.closed = []
+
+    def positions_get(self, symbol=None, ticket=None, group=None):
+        return tuple(self.open_positions)
+
+    def copy_rates_from_pos(self, symbol, timeframe, start_pos, count):
+        # Latest closed bar ends at NOW, older bars are flat
+        rates = np.zeros(count, dtype=RATES_DTYPE)
+        rates['time'] = NOW - 60 * np.arange(count, 0, -1)
+        rates['high'] = self.bar_highs
+        rates['low'] = self.bar_lows
+        rates['spread'] = SPREAD
+        return rates
+
+    def Close(self, symbol, *, comment=None, ticket=None):
+        self.closed.append(ticket)
+        return True
+
+
+def position(ticket, position_type, price_open, price_current, comment=AROON_COMMENT, open_time=NOW - 3600):
+    return TradePosition(ticket, open_time, open_time * 1000, position_type, BOT_MAGIC, ticket, 0.1, price_open,
+                         0.0, 0.0, price_current, 0.0, 'GBPUSDm', comment)
+
+def config(trailing_stop_pips=None, up_exit=None, down_exit=None):
+    aroon_params = {'up_line_exit_thresh': up_exit, 'down_line_exit_thresh': down_exit} if up_exit is not None else {}
+    return {'trade_params': {'trailing_stop_pips': trailing_stop_pips},
+            'strategy_params': {'AROON_CUSTOM_ENTRY_EXIT': aroon_params}}
+
+
+@pytest.fixture
+def terminal():
+    terminal = FixedTerminal()
+    # Flat bars around 1.25000
+    terminal.bar_highs = np.full(WINDOW_SIZE, 1.25010)
+    terminal.bar_lows = np.full(WINDOW_SIZE, 1.24990)
+    previous = use_terminal(terminal)
+    yield terminal
+    use_terminal(previous)
+
+def exit_manager(terminal, config_data):
+    return ExitManager(terminal.TIMEFRAME_M1, lambda: config_data, window_size=WINDOW_SIZE)
+
+
+def test_sell_without_price_movement_is_not_trailed_out(terminal):
+    # Sell opened at bid, its closing price is ask which is a spread above it
+    terminal.open_positions = [position(1, terminal.POSITION_TYPE_SELL, 1.25000, 1.25000 + SPREAD * POINT)]
+    terminal.bar_lows = np.full(WINDOW_SIZE, 1.25000)
+    terminal.bar_highs = np.full(WINDOW_SIZE, 1.25000)
+    manager = exit_manager(terminal, config(trailing_stop_pips=10))
+    assert manager.evaluate() == []
+    assert manager.best_prices[1] == pytest.approx(1.25000 + SPREAD * POINT)
+
+def test_buy_without_price_movement_is_not_trailed_out(terminal):
+    # Buy opened at ask, its closing price is bid which is a spread below it
+    terminal.open_positions = [position(1, terminal.POSITION_TYPE_BUY, 1.25000 + SPREAD * POINT, 1.25000)]
+    terminal.bar_lows = np.full(WINDOW_SIZE, 1.25000)
+    terminal.bar_highs = np.full(WINDOW_SIZE, 1.25000)
+    assert exit_manager(terminal, config(trailing_stop_pips=10)).evaluate() == []
+
+def test_trailing_stop_uses_closing_side_of_bars(terminal):
+    buy = position(1, terminal.POSITION_TYPE_BUY, 1.25000, 1.25000)
+    sell = position(2, terminal.POSITION_TYPE_SELL, 1.25000, 1.25000 + SPREAD * POINT)
+    terminal.open_positions = [buy, sell]
+    # Latest bar traded 15 points below and above current bid
+    terminal.bar_lows[-1] = 1.24985
+    terminal.bar_highs[-1] = 1.25015
+    manager = exit_manager(terminal, config(trailing_stop_pips=10))
+    # Bid retraced 15 points from high of bar, ask 15 points from low of bar plus spread
+    assert manager.evaluate() == [(1, 'GBPUSDm'), (2, 'GBPUSDm')]
+    assert manager.best_prices == {1: pytest.approx(1.25015), 2: pytest.approx(1.24985 + SPREAD * POINT)}
+    assert terminal.closed == [1, 2]
+
+def test_trailing_stop_keeps_best_price_across_evaluations(terminal):
+    terminal.open_positions = [position(1, terminal.POSITION_TYPE_BUY, 1.25000, 1.25005)]
+    manager = exit_manager(terminal, config(trailing_stop_pips=10))
+    assert manager.evaluate() == []
+    assert manager.best_prices[1] == pytest.approx(1.25010)
+
+    # Bid falls back 11 points from best price seen before
+    terminal.bar_highs[-1] = 1.25002
+    terminal.open_positions = [position(1, terminal.POSITION_TYPE_BUY, 1.25000, 1.24999)]
+    assert manager.evaluate() == [(1, 'GBPUSDm')]
+
+def test_bars_before_position_was_opened_are_ignored(terminal):
+    terminal.open_positions = [position(1, terminal.POSITION_TYPE_BUY, 1.25000, 1.25000, open_time=NOW - 30)]
+    terminal.bar_highs[-1] = 1.25050
+    assert exit_manager(terminal, config(trailing_stop_pips=10)).evaluate() == []
+
+def test_aroon_exit_only_closes_aroon_positions(terminal):
+    aroon_buy = position(1, terminal.POSITION_TYPE_BUY, 1.25000, 1.25000)
+    other_buy = position(2, terminal.POSITION_TYPE_BUY, 1.25000, 1.25000, comment='Load test')
+    aroon_sell = position(3, terminal.POSITION_TYPE_SELL, 1.25000, 1.25020)
+    terminal.open_positions = [aroon_buy, other_buy, aroon_sell]
+    # Highest high and lowest low are both in latest bar, so Aroon up and down are at 80
+    terminal.bar_highs[-1] = 1.25011
+    terminal.bar_lows[-1] = 1.24989
+    assert exit_manager(terminal, config(up_exit=70, down_exit=30)).evaluate() == [(1, 'GBPUSDm')]
+
+def test_positions_of_other_magic_are_ignored(terminal):
+    terminal.open_positions = [position(1, terminal.POSITION_TYPE_BUY, 1.25000, 1.25000)._replace(magic=1)]
+    terminal.bar_highs[-1] = 1.25050
+    manager = exit_manager(terminal, config(trailing_stop_pips=10, up_exit=0, down_exit=100))
+    assert manager.evaluate() == []
+    assert manager.best_prices == {}
@@ -0,0 +1,111 @@
+import time
+import pytest
+from sim_terminal import SimTerminal
+from exposure import ExposureTracker, ExposureTerminal, ExposureSync
+
+NOW = 1_700_000_000.0
+
+
+@pytest.fixture
+def terminal():
+    now = [NOW]
+    terminal = SimTerminal(time_fn=lambda: now[0])
+    terminal.now = now
+    return terminal
+
+def buy(terminal, symbol, volume, **request):
+    tick = terminal.symbol_info_tick(symbol)
+    return terminal.order_send(dict({'action': terminal.TRADE_ACTION_DEAL, 'symbol': symbol, 'volume': volume,
+                                     'type': terminal.ORDER_TYPE_BUY, 'price': tick.ask}, **request))
+
+
+def test_position_closed_by_stop_is_removed_on_sync(terminal):
+    tracker = ExposureTracker()
+    exposure_terminal = ExposureTerminal(terminal, tracker)
+    tick = exposure_terminal.symbol_info_tick('EURUSDm')
+    result = buy(exposure_terminal, 'EURUSDm', 1.0, sl=tick.bid - 0.00001, tp=tick.bid + 0.00001)
+    assert tracker.n_positions == 1
+    assert not tracker.check_order('EURUSDm', 1, 1.0, max_exposure=150000)
+
+    # Price moves through stop loss or take profit and terminal closes position on its own
+    terminal.now[0] += 30 * 60
+    exposure_terminal.symbol_info_tick('EURUSDm')
+    assert not terminal.positions
+    assert tracker.n_positions == 1
+    exposure_terminal.positions_get()
+    assert tracker.n_positions == 0
+    assert result.order not in tracker.rows
+    assert tracker.check_order('EURUSDm', 1, 1.0, max_exposure=150000)
+
+def test_sync_adds_and_removes_positions_of_symbol_only(terminal):
+    tracker = ExposureTracker()
+    exposure_terminal = ExposureTerminal(terminal, tracker)
+    eur = buy(terminal, 'EURUSDm', 0.5)
+    gbp = buy(terminal, 'GBPUSDm', 0.5)
+    exposure_terminal.positions_get()
+    assert set(tracker.rows) == {eur.order, gbp.order}
+
+    terminal.Close('EURUSDm', ticket=eur.order)
+    exposure_terminal.positions_get(symbol='GBPUSDm')
+    assert set(tracker.rows) == {eur.order, gbp.order}
+    exposure_terminal.positions_get(symbol='EURUSDm')
+    assert set(tracker.rows) == {gbp.order}
+
+def test_listing_taken_before_order_does_not_undo_it(terminal):
+    tracker = ExposureTracker()
+    exposure_terminal = ExposureTerminal(terminal, tracker)
+    closed = buy(exposure_terminal, 'EURUSDm', 0.5)
+    exposure_terminal.positions_get()
+
+    # Listing is taken by background sync while trading thread opens one position and closes another
+    since = tracker.n_changes
+    positions = terminal.positions_get()
+    opened = buy(exposure_terminal, 'EURUSDm', 0.5)
+    exposure_terminal.Close('EURUSDm', ticket=closed.order)
+    tracker.sync(positions, buy_type=terminal.POSITION_TYPE_BUY, since=since)
+    assert set(tracker.rows) == {opened.order}
+
+    # Next listing is authoritative again
+    terminal.Close('EURUSDm', ticket=opened.order)
+    exposure_terminal.positions_get()
+    assert tracker.n_positions == 0
+    assert not tracker.changed_tickets.keys() - {opened.order}
+
+def test_sync_thread_removes_positions_closed_by_terminal(terminal):
+    tracker = ExposureTracker()
+    exposure_terminal = ExposureTerminal(terminal, tracker)
+    tick = exposure_terminal.symbol_info_tick('EURUSDm')
+    buy(exposure_terminal, 'EURUSDm', 1.0, sl=tick.bid - 0.00001, tp=tick.bid + 0.00001)
+    terminal.now[0] += 30 * 60
+    terminal.symbol_info_tick('EURUSDm')
+    assert not terminal.positions and tracker.n_positions == 1
+
+    sync = ExposureSync(exposure_terminal, interval=0.01)
+    sync.start()
+    deadline = time.time() + 5
+    while tracker.n_positions and time.time() < deadline:
+        time.sleep(0.01)
+    sync.stop()
+    sync.thread.join(timeout=5)
+    assert tracker.n_positions == 0
+
+def test_check_order_limits_exposure_and_allows_reductions(terminal):
+    tracker = ExposureTracker()
+    exposure_terminal = ExposureTerminal(terminal, tracker)
+    exposure_terminal.symbol_info_tick('EURUSDm')
+    buy(exposure_terminal, 'EURUSDm', 1.0)
+    # 1 lot is 100000 EUR, worth about 108000 USD
+    assert tracker.check_order('EURUSDm', 1, 0.3, max_exposure=150000)
+    assert not tracker.check_order('EURUSDm', 1, 1.0, max_exposure=150000)
+    assert tracker.check_order('EURUSDm', -1, 1.0, max_exposure=50000)
+
+def test_floating_pnl_matches_terminal(terminal):
+    tracker = ExposureTracker()
+    exposure_terminal = ExposureTerminal(terminal, tracker)
+    buy(exposure_terminal, 'EURUSDm', 1.0)
+    buy(exposure_terminal, 'GBPUSDm', 0.5)
+    terminal.now[0] += 10 * 60
+    positions = exposure_terminal.positions_get()
+    for symbol in ('EURUSDm', 'GBPUSDm'):
+        exposure_terminal.symbol_info_tick(symbol)
+    assert tracker.floating_pnl() == pytest.approx(sum(position.profit for position in positions), abs=0.05)
@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+from sim_terminal import SimTerminal
+from journal import RecordingTerminal, ReplayTerminal, JournalExhausted
+
+
+def record_session(journal_fpath):
+    terminal = SimTerminal(time_fn=lambda: 1_700_000_000.0)
+    recorder = RecordingTerminal(terminal, journal_fpath)
+    rates = recorder.copy_rates_from_pos('EURUSDm', SimTerminal.TIMEFRAME_M1, 0, 10)
+    tick = recorder.symbol_info_tick('EURUSDm')
+    recorder.close()
+    return rates, tick
+
+
+def test_replay_serves_recorded_responses(tmp_path):
+    journal_fpath = tmp_path / 'session.journal'
+    rates, tick = record_session(journal_fpath)
+    replay = ReplayTerminal(journal_fpath)
+    np.testing.assert_array_equal(replay.copy_rates_from_pos('EURUSDm', SimTerminal.TIMEFRAME_M1, 0, 10), rates)
+    assert tuple(replay.symbol_info_tick('EURUSDm')) == tuple(tick)
+    assert not replay.mismatches
+
+def test_exhausted_replay_passes_through_loop_error_handling(tmp_path):
+    journal_fpath = tmp_path / 'session.journal'
+    record_session(journal_fpath)
+    replay = ReplayTerminal(journal_fpath)
+    replay.symbol_info_tick('EURUSDm')
+    with pytest.raises(JournalExhausted):
+        # Strategy loops log and terminate on any Exception
+        try:
+            replay.symbol_info_tick('EURUSDm')
+        except Exception:
+            pytest.fail("Journal exhaustion was handled as an error")
@@ -0,0 +1,64 @@
+from collections import namedtuple
+import pytest
+from clock import set_clock, VirtualClock
+from signal_guard import Signal, check_signal, signal_counters
+
+Tick = namedtuple('Tick', ['time', 'bid', 'ask'])
+
+BUY, SELL = 0, 1
+M1 = 1
+POINT = 0.00001
+NOW = 1_700_000_000.0
+
+
+@pytest.fixture(autouse=True)
+def clock():
+    clock = VirtualClock(NOW)
+    previous = set_clock(clock)
+    signal_counters.clear()
+    yield clock
+    set_clock(previous)
+
+def make_signal(order_type, price=1.27000, signal_time=NOW, bar_time=int(NOW) - 55):
+    return Signal(order_type, bar_time, price, M1, signal_time)
+
+
+def test_sell_is_not_dropped_for_spread():
+    tick = Tick(int(NOW), 1.27000, 1.27012)
+    assert check_signal(make_signal(SELL), tick, POINT, tick.ask)
+    assert signal_counters['accepted'] == 1
+
+def test_buy_and_sell_are_dropped_when_bid_moves():
+    tick = Tick(int(NOW), 1.27011, 1.27023)
+    assert not check_signal(make_signal(BUY), tick, POINT, tick.bid)
+    assert not check_signal(make_signal(SELL), tick, POINT, tick.ask)
+    assert signal_counters['deviated'] == 2
+
+def test_signal_computed_late_in_bar_is_fresh():
+    # Bar opened 55s before signal was computed, so bar closes 5s after it
+    tick = Tick(int(NOW) + 10, 1.27000, 1.27012)
+    assert check_signal(make_signal(BUY), tick, POINT, tick.bid)
+
+def test_signal_older_than_deadline_is_dropped(clock):
+    clock.sleep(61)
+    tick = Tick(int(NOW) + 61, 1.27000, 1.27012)
+    assert not check_signal(make_signal(BUY), tick, POINT, tick.bid)
+    assert check_signal(make_signal(BUY), tick, POINT, tick.bid, signal_deadline=120)
+    assert signal_counters['expired'] == 1
+
+def test_plain_order_types_are_accepted():
+    assert check_signal(BUY, Tick(0, 2.0, 2.1), POINT, 2.0)
+
+def test_signal_just_computed_on_stale_bars_is_dropped():
+    # Terminal served bars ending 3 minutes back e.g. after a reconnect
+    tick = Tick(int(NOW), 1.27000, 1.27012)
+    assert not check_signal(make_signal(BUY, bar_time=int(NOW) - 180), tick, POINT, tick.bid)
+    assert signal_counters['stale_bars'] == 1
+    assert check_signal(make_signal(BUY, bar_time=int(NOW) - 180), tick, POINT, tick.bid, signal_deadline=150)
+
+def test_signal_of_other_broker_only_has_its_age_checked(clock):
+    signal = make_signal(BUY)._replace(price=None, bar_time=None)
+    tick = Tick(0, 150.0, 150.01)
+    assert check_signal(signal, tick, POINT, tick.bid)
+    clock.sleep(61)
+    assert not check_signal(signal, tick, POINT, tick.bid)
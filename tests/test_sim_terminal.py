@@ -0,0 +1,50 @@
+from sim_terminal import SimTerminal
+
+NOW = 1_700_000_000.0
+
+
+def open_position(terminal, symbol, order_type, sl_points=None, tp_points=None):
+    tick = terminal.symbol_info_tick(symbol)
+    point = terminal.symbol_info(symbol).point
+    direction = 1 if order_type == terminal.ORDER_TYPE_BUY else -1
+    price = tick.ask if direction > 0 else tick.bid
+    request = {'action': terminal.TRADE_ACTION_DEAL, 'symbol': symbol, 'volume': 0.1, 'type': order_type}
+    if sl_points is not None:
+        request.update(sl=price - direction * sl_points * point, tp=price + direction * tp_points * point)
+    return terminal.order_send(request).order
+
+
+def test_stops_close_positions_of_quoted_symbol_only():
+    now = [NOW]
+    terminal = SimTerminal(time_fn=lambda: now[0])
+    tight = [open_position(terminal, 'EURUSDm', order_type, 20, 20) for order_type in (terminal.ORDER_TYPE_BUY, terminal.ORDER_TYPE_SELL)]
+    wide = open_position(terminal, 'EURUSDm', terminal.ORDER_TYPE_BUY, 100000, 100000)
+    other = open_position(terminal, 'GBPUSDm', terminal.ORDER_TYPE_BUY, 20, 20)
+    assert set(terminal.positions) == set(tight) | {wide, other}
+
+    # Stops are checked whenever symbol is quoted
+    for _ in range(30):
+        now[0] += 60
+        terminal.symbol_info_tick('EURUSDm')
+    assert set(terminal.positions) == {wide, other}
+    assert set(terminal.symbol_positions['EURUSDm']) == {wide}
+    exits = [deal for deal in terminal.deals if deal.entry == terminal.DEAL_ENTRY_OUT]
+    assert sorted(deal.position_id for deal in exits) == sorted(tight)
+
+    # Position opened after band was computed is still checked
+    tight_again = open_position(terminal, 'EURUSDm', terminal.ORDER_TYPE_SELL, 20, 20)
+    for _ in range(30):
+        now[0] += 60
+        terminal.positions_get()
+    assert set(terminal.positions) == {wide}
+    assert tight_again not in terminal.symbol_positions['EURUSDm']
+
+def test_close_by_ticket_and_symbol():
+    terminal = SimTerminal(time_fn=lambda: NOW)
+    first = open_position(terminal, 'EURUSDm', terminal.ORDER_TYPE_BUY)
+    second = open_position(terminal, 'EURUSDm', terminal.ORDER_TYPE_SELL)
+    assert terminal.Close('EURUSDm', ticket=first)
+    assert set(terminal.positions) == {second}
+    assert not terminal.Close('GBPUSDm')
+    assert terminal.Close('EURUSDm')
+    assert not terminal.positions and not terminal.symbol_positions['EURUSDm']
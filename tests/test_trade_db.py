@@ -0,0 +1,106 @@
+from datetime import datetime, timezone
+import pytest
+from sim_terminal import SimTerminal
+from terminal import use_terminal
+from trade_db import TradeDatabase, connect, pnl_by_strategy_and_symbol, DEALS_OVERLAP_SECS
+
+NOW = 1_700_000_000.0
+
+
+class HistoryCallsTerminal(SimTerminal):
+    """
+    Stand-in terminal remembering date ranges deal history was requested for
+    """
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.history_calls = []
+
+    def history_deals_get(self, date_from, date_to, **kwargs):
+        self.history_calls.append((date_from, date_to))
+        return super().history_deals_get(date_from, date_to, **kwargs)
+
+
+@pytest.fixture
+def terminal():
+    now = [NOW]
+    terminal = HistoryCallsTerminal(time_fn=lambda: now[0])
+    terminal.now = now
+    previous = use_terminal(terminal)
+    yield terminal
+    use_terminal(previous)
+
+def open_and_close(terminal, comment, symbol='EURUSDm'):
+    request = {'action': terminal.TRADE_ACTION_DEAL, 'symbol': symbol, 'volume': 0.1, 'type': terminal.ORDER_TYPE_BUY,
+               'magic': 123456, 'comment': comment}
+    result = terminal.order_send(request)
+    terminal.now[0] += 60
+    terminal.Close(symbol, ticket=result.order)
+
+
+def test_sync_requests_utc_and_overlaps_from_last_deal(terminal, tmp_path):
+    database = TradeDatabase(str(tmp_path / 'trades.db'))
+    connection = connect(database.db_fpath)
+    deals_from = NOW - 24 * 60 * 60
+    open_and_close(terminal, 'RSI Trading bot')
+    terminal.now[0] += 6 * 60 * 60
+
+    next_deals_from = database._sync(connection, deals_from)
+    date_from, date_to = terminal.history_calls[-1]
+    assert date_from.tzinfo == timezone.utc and date_to.tzinfo == timezone.utc
+    assert date_from == datetime.fromtimestamp(deals_from, tz=timezone.utc)
+    last_deal_time = max(deal.time for deal in terminal.deals)
+    assert next_deals_from == last_deal_time - DEALS_OVERLAP_SECS
+
+    # Deals synced again due to overlap are stored once
+    database._sync(connection, next_deals_from)
+    assert connection.execute("SELECT COUNT(*) FROM deals").fetchone()[0] == 2
+    connection.close()
+
+def test_sync_keeps_window_without_deals(terminal, tmp_path):
+    database = TradeDatabase(str(tmp_path / 'trades.db'))
+    connection = connect(database.db_fpath)
+    assert database._sync(connection, NOW - 60) == NOW - 60
+    connection.close()
+
+def test_pnl_by_strategy_and_symbol(terminal, tmp_path):
+    database = TradeDatabase(str(tmp_path / 'trades.db'))
+    connection = connect(database.db_fpath)
+    open_and_close(terminal, 'RSI Trading bot')
+    open_and_close(terminal, 'AR trading bot')
+    open_and_close(terminal, 'RSI Trading bot', symbol='USDJPYm')
+    database._sync(connection, NOW - 60)
+    connection.close()
+
+    since = datetime.fromtimestamp(NOW, tz=timezone.utc).replace(tzinfo=None)
+    rows = pnl_by_strategy_and_symbol(database.db_fpath, since)
+    exit_profits = {}
+    for deal in terminal.deals:
+        if deal.entry == terminal.DEAL_ENTRY_OUT:
+            key = (deal.comment, deal.symbol)
+            exit_profits[key] = exit_profits.get(key, 0.0) + deal.profit
+    assert {(strategy, symbol): pnl for strategy, symbol, _, pnl in rows} == pytest.approx(exit_profits)
+    assert pnl_by_strategy_and_symbol(database.db_fpath, since, until=since) == []
+
+def test_pnl_includes_all_exit_kinds_and_entry_commission(tmp_path):
+    db_fpath = str(tmp_path / 'trades.db')
+    connection = connect(db_fpath)
+    deal_time = int(NOW) + 60
+    # ticket, order, position, time, type, entry, magic, symbol, volume, price, profit, commission, swap, comment
+    deals = [
+        # Position closed in two parts, by an out deal and by a close by deal
+        (1, 1, 1, deal_time, 0, 0, 123456, 'EURUSDm', 0.2, 1.08, 0.0, -1.4, 0.0, 'RSI Trading bot'),
+        (2, 2, 1, deal_time, 1, 1, 123456, 'EURUSDm', 0.1, 1.09, 10.0, -0.7, -0.1, ''),
+        (3, 3, 1, deal_time, 1, 3, 123456, 'EURUSDm', 0.1, 1.09, 10.0, -0.7, 0.0, ''),
+        # Netting position reversed by an in/out deal
+        (4, 4, 4, deal_time, 0, 0, 123456, 'USDJPYm', 0.1, 150.0, 0.0, -0.5, 0.0, 'AR custom trading bot'),
+        (5, 5, 4, deal_time, 1, 2, 123456, 'USDJPYm', 0.3, 151.0, 6.0, -1.5, 0.0, ''),
+    ]
+    with connection:
+        connection.executemany("INSERT INTO deals VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", deals)
+    connection.close()
+
+    since = datetime.fromtimestamp(NOW, tz=timezone.utc).replace(tzinfo=None)
+    rows = pnl_by_strategy_and_symbol(db_fpath, since)
+    assert [(strategy, symbol, n_deals) for strategy, symbol, n_deals, _ in rows] == [
+        ('AR custom trading bot', 'USDJPYm', 1), ('RSI Trading bot', 'EURUSDm', 2)]
+    assert [pnl for _, _, _, pnl in rows] == pytest.approx([6.0 - 1.5 - 0.5, 20.0 - 1.4 - 0.1 - 1.4])
@@ -0,0 +1,36 @@
+import copy
+import pytest
+from utils import validate_config
+
+CONFIG = {
+    'credentials': {'login': 1, 'password': 'password', 'server': 'server', 'mt5_exe_path': 'terminal64.exe'},
+    'trade_params': {'symbol': 'EURUSDm', 'lot_size': 0.01, 'timeframe': '1min', 'strategy': 'AROON', 'sleep_interval': 60},
+    'strategy_params': {},
+}
+
+
+def test_valid_config():
+    validate_config(CONFIG)
+
+@pytest.mark.parametrize('key', ['lot_size', 'sleep_interval', 'stop_loss_pips_margin', 'max_currency_exposure'])
+def test_boolean_trade_param_is_rejected(key):
+    config_data = copy.deepcopy(CONFIG)
+    config_data['trade_params'][key] = True
+    with pytest.raises(ValueError, match=key):
+        validate_config(config_data)
+
+def test_boolean_strategy_param_is_rejected():
+    config_data = copy.deepcopy(CONFIG)
+    config_data['trade_params']['strategy'] = 'RSI'
+    config_data['strategy_params']['RSI'] = {'rsi_period': True, 'rsi_lower_thresh': 30, 'rsi_upper_thresh': 70}
+    with pytest.raises(ValueError, match='rsi_period'):
+        validate_config(config_data)
+
+def test_account_can_not_share_main_terminal():
+    config_data = copy.deepcopy(CONFIG)
+    account_credentials = dict(CONFIG['credentials'], login=2)
+    config_data['accounts'] = [{'credentials': account_credentials, 'lot_size': 0.1}]
+    with pytest.raises(ValueError, match='mt5_exe_path'):
+        validate_config(config_data)
+    account_credentials['mt5_exe_path'] = 'account2/terminal64.exe'
+    validate_config(config_data)
@@ -0,0 +1,30 @@
+import json
+import numpy as np
+import pytest
+from sim_terminal import SimTerminal
+from walk_forward import bars_path, symbol_info_path, run_walk_forward, WARMUP_BARS
+
+CONFIG = {
+    'trade_params': {'symbol': 'XAUUSDm', 'lot_size': 0.01, 'timeframe': '1min', 'strategy': 'AROON', 'sleep_interval': 60,
+                     'stop_loss_pips_margin': 50, 'take_profit_pips_margin': 25},
+    'strategy_params': {},
+}
+
+
+def save_bars(bars_dir, n_bars):
+    rates = SimTerminal(time_fn=lambda: 1_700_000_000.0).copy_rates_from_pos('XAUUSDm', SimTerminal.TIMEFRAME_M1, 0, n_bars)
+    np.save(bars_path(str(bars_dir), 'XAUUSDm', '1min'), rates)
+
+
+def test_symbol_without_saved_info_fails(tmp_path):
+    save_bars(tmp_path, WARMUP_BARS + 20)
+    with pytest.raises(RuntimeError, match='XAUUSDm'):
+        run_walk_forward({'gold.json': CONFIG}, str(tmp_path), 10, 10, 10, 1)
+
+def test_symbol_unknown_to_stand_in_terminal_uses_saved_info(tmp_path):
+    save_bars(tmp_path, WARMUP_BARS + 40)
+    with open(symbol_info_path(str(tmp_path), 'XAUUSDm'), 'w') as f:
+        json.dump({'point': 0.01, 'digits': 2}, f)
+    ((window, train, test),) = run_walk_forward({'gold.json': CONFIG}, str(tmp_path), 20, 20, 20, 1)['gold.json']
+    assert window == (WARMUP_BARS, WARMUP_BARS + 20, WARMUP_BARS + 40)
+    assert len(train) == len(test) == 4
@@ -0,0 +1,255 @@
+import time
+import queue
+import sqlite3
+import logging
+import argparse
+import threading
+from datetime import datetime, timezone
+from clock import get_clock
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS orders (
+    ticket INTEGER PRIMARY KEY,
+    time REAL NOT NULL,
+    symbol TEXT NOT NULL,
+    type INTEGER NOT NULL,
+    volume REAL,
+    price REAL,
+    sl REAL,
+    tp REAL,
+    magic INTEGER,
+    comment TEXT,
+    retcode INTEGER,
+    deal INTEGER
+);
+CREATE INDEX IF NOT EXISTS orders_magic_comment_time ON orders (magic, comment, time);
+CREATE INDEX IF NOT EXISTS orders_symbol_time ON orders (symbol, time);
+
+CREATE TABLE IF NOT EXISTS deals (
+    ticket INTEGER PRIMARY KEY,
+    order_ticket INTEGER,
+    position_id INTEGER,
+    time INTEGER NOT NULL,
+    type INTEGER,
+    entry INTEGER,
+    magic INTEGER,
+    symbol TEXT NOT NULL,
+    volume REAL,
+    price REAL,
+    profit REAL,
+    commission REAL,
+    swap REAL,
+    comment TEXT
+);
+CREATE INDEX IF NOT EXISTS deals_entry_time ON deals (entry, time);
+CREATE INDEX IF NOT EXISTS deals_position_entry ON deals (position_id, entry);
+CREATE INDEX IF NOT EXISTS deals_magic_comment_time ON deals (magic, comment, time);
+CREATE INDEX IF NOT EXISTS deals_symbol_time ON deals (symbol, time);
+
+CREATE TABLE IF NOT EXISTS positions (
+    ticket INTEGER PRIMARY KEY,
+    time INTEGER,
+    symbol TEXT NOT NULL,
+    type INTEGER,
+    volume REAL,
+    price_open REAL,
+    sl REAL,
+    tp REAL,
+    price_current REAL,
+    profit REAL,
+    magic INTEGER,
+    comment TEXT,
+    updated REAL
+);
+CREATE INDEX IF NOT EXISTS positions_magic_comment ON positions (magic, comment);
+"""
+
+# Deal and position times are terminal server times as seconds since epoch, order record times are clock times
+
+# Realized PnL per strategy and symbol. Exit deals i.e. out (1), reversal (2) and close by (3) deals are attributed
+# to strategy comment of first entry (0) deal of their position. Commission of entry deal is charged to exit deals
+# pro rata to their volume, so that it is counted once per position even if it is closed in parts
+PNL_QUERY = """
+SELECT entry_deal.comment AS strategy, exit_deal.symbol AS symbol, COUNT(*) AS n_deals,
+       SUM(exit_deal.profit + exit_deal.commission + exit_deal.swap
+           + COALESCE(entry_deal.commission, 0) * MIN(exit_deal.volume / entry_deal.volume, 1)) AS pnl
+FROM deals AS exit_deal
+JOIN deals AS entry_deal ON entry_deal.ticket = (
+    SELECT MIN(ticket) FROM deals WHERE position_id = exit_deal.position_id AND entry = 0)
+WHERE exit_deal.entry IN (1, 2, 3) AND exit_deal.time >= ? AND exit_deal.time < ?
+GROUP BY entry_deal.comment, exit_deal.symbol
+ORDER BY entry_deal.comment, exit_deal.symbol
+"""
+
+# Max no. of records written in a single transaction
+MAX_BATCH_SIZE = 1000
+
+# Deals are fetched again from this many seconds before last stored deal since deals may arrive late
+DEALS_OVERLAP_SECS = 60 * 60
+
+# Max real seconds writer waits for records before checking clock, which may be virtual, for next sync
+MAX_WAIT_SECS = 1.0
+
+
+class TradeDatabase:
+    """
+    Local SQLite database of orders, deals and open positions. Records are queued by trading thread and written
+    in batches by a background thread, which also syncs deal history and open positions from terminal.
+    """
+    def __init__(self, db_fpath, sync_interval=60, history_days=7):
+        """
+        args:
+            db_fpath: SQLite database file path
+            sync_interval: Seconds between two syncs of deal history and open positions from terminal
+            history_days: No. of days of deal history fetched on first sync
+        """
+        self.db_fpath = db_fpath
+        self.sync_interval = sync_interval
+        self.history_days = history_days
+        self.records = queue.Queue()
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name='trade-db', daemon=True)
+        self.thread.start()
+        logger.info(f"Recording trades to {self.db_fpath}")
+
+    def stop(self):
+        """
+        Write queued records and stop writer thread
+        """
+        if self.thread is not None:
+            self.records.put(None)
+            self.thread.join(timeout=30)
+
+    def record_order(self, result):
+        """
+        Queue order send result for writing. Does not block trading thread
+        args:
+            result: Order send result including its request
+        """
+        if result is not None and result.order:
+            self.records.put(('order', get_clock().time(), result))
+
+    def _run(self):
+        connection = connect(self.db_fpath)
+        last_sync_time = 0.0
+        deals_from = get_clock().time() - self.history_days * 24 * 60 * 60
+        stopping = False
+        while not stopping:
+            timeout = min(max(last_sync_time + self.sync_interval - get_clock().time(), 0), MAX_WAIT_SECS)
+            batch = []
+            try:
+                batch.append(self.records.get(timeout=timeout))
+                while len(batch) < MAX_BATCH_SIZE:
+                    batch.append(self.records.get_nowait())
+            except queue.Empty:
+                pass
+            if None in batch:
+                batch.remove(None)
+                stopping = True
+            try:
+                if batch:
+                    self._write_orders(connection, batch)
+                if stopping or get_clock().time() - last_sync_time >= self.sync_interval:
+                    deals_from = self._sync(connection, deals_from)
+                    last_sync_time = get_clock().time()
+            except Exception as ex:
+                logger.error(f"Failed to write trades to {self.db_fpath}: {ex}", exc_info=True)
+        connection.close()
+
+    def _write_orders(self, connection, batch):
+        rows = []
+        for _, record_time, result in batch:
+            request = result.request if isinstance(result.request, dict) else result.request._asdict()
+            rows.append((result.order, record_time, request.get('symbol'), request.get('type'), result.volume, result.price,
+                         request.get('sl'), request.get('tp'), request.get('magic'), request.get('comment'), result.retcode, result.deal))
+        with connection:
+            connection.executemany("INSERT OR REPLACE INTO orders VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def _sync(self, connection, deals_from):
+        """
+        Sync deal history since given time and snapshot of open positions from terminal
+        args:
+            deals_from: Server time from which deals are fetched
+        returns:
+            Server time from which deals should be fetched on next sync
+        """
+        import MetaTrader5 as mt5
+
+        # Terminal takes times in UTC. Server time may be ahead of clock by up to a day
+        sync_to = get_clock().time() + 24 * 60 * 60
+        deals = mt5.history_deals_get(datetime.fromtimestamp(deals_from, tz=timezone.utc),
+                                      datetime.fromtimestamp(sync_to, tz=timezone.utc)) or ()
+        positions = mt5.positions_get() or ()
+        deal_rows = [(deal.ticket, deal.order, deal.position_id, deal.time, deal.type, deal.entry, deal.magic, deal.symbol,
+                      deal.volume, deal.price, deal.profit, getattr(deal, 'commission', 0.0), getattr(deal, 'swap', 0.0), deal.comment)
+                     for deal in deals]
+        now = get_clock().time()
+        position_rows = [(position.ticket, position.time, position.symbol, position.type, position.volume, position.price_open,
+                          position.sl, position.tp, position.price_current, position.profit, position.magic, position.comment, now)
+                         for position in positions]
+        with connection:
+            connection.executemany("INSERT OR REPLACE INTO deals VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", deal_rows)
+            connection.execute("DELETE FROM positions")
+            connection.executemany("INSERT INTO positions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", position_rows)
+        logger.debug(f"Synced {len(deal_rows)} deals and {len(position_rows)} open positions to {self.db_fpath}")
+        last_deal_time = connection.execute("SELECT MAX(time) FROM deals").fetchone()[0]
+        if last_deal_time is None:
+            return deals_from
+        return max(deals_from, last_deal_time - DEALS_OVERLAP_SECS)
+
+
+def connect(db_fpath):
+    """
+    Open trade database, creating tables and indexes if needed
+    args:
+        db_fpath: SQLite database file path
+    returns:
+        SQLite connection
+    """
+    connection = sqlite3.connect(db_fpath)
+    # WAL lets queries run while bot keeps writing
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.executescript(SCHEMA)
+    return connection
+
+def server_timestamp(server_datetime):
+    """
+    Seconds since epoch of naive datetime in terminal server time, in the same way terminal stores deal times
+    """
+    return int(server_datetime.replace(tzinfo=timezone.utc).timestamp())
+
+def pnl_by_strategy_and_symbol(db_fpath, since, until=None):
+    """
+    Realized PnL per strategy comment and symbol
+    args:
+        db_fpath: SQLite database file path
+        since: Start datetime in terminal server time
+        until: End datetime in terminal server time, defaults to no limit
+    returns:
+        List of (strategy, symbol, no. of deals, pnl) tuples
+    """
+    connection = connect(db_fpath)
+    try:
+        return connection.execute(PNL_QUERY, (server_timestamp(since), server_timestamp(until) if until else 2 ** 62)).fetchall()
+    finally:
+        connection.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Query local trade database')
+    parser.add_argument('db_file', help='Trade database file path')
+    parser.add_argument('--since', required=True, type=datetime.fromisoformat, help='Start date in terminal server time e.g. 2026-10-12')
+    parser.add_argument('--until', type=datetime.fromisoformat, help='End date in terminal server time, defaults to no limit')
+    args = parser.parse_args()
+
+    start_time = time.perf_counter()
+    rows = pnl_by_strategy_and_symbol(args.db_file, args.since, args.until)
+    print(f"{'strategy':<30} {'symbol':<12} {'deals':>8} {'pnl':>12}")
+    for strategy, symbol, n_deals, pnl in rows:
+        print(f"{str(strategy):<30} {symbol:<12} {n_deals:>8} {pnl:>12.2f}")
+    print(f"Query took {(time.perf_counter() - start_time) * 1000:.1f}ms")
@@ -35,6 +35,23 @@ def parse_trade_timeframe(trade_timeframe):
         return mt5.TIMEFRAME_D1
     elif trade_timeframe == "1week":
         return mt5.TIMEFRAME_W1
+
+def timeframe_seconds(timeframe):
+    """
+    Duration of a single bar for metatrader timeframe
+        args: timeframe: Timeframe in meta trader format
+        return: Bar duration in seconds
+    """
+    return {
+        mt5.TIMEFRAME_M1: 60,
+        mt5.TIMEFRAME_M5: 5 * 60,
+        mt5.TIMEFRAME_M15: 15 * 60,
+        mt5.TIMEFRAME_M30: 30 * 60,
+        mt5.TIMEFRAME_H1: 60 * 60,
+        mt5.TIMEFRAME_H4: 4 * 60 * 60,
+        mt5.TIMEFRAME_D1: 24 * 60 * 60,
+        mt5.TIMEFRAME_W1: 7 * 24 * 60 * 60,
+    }[timeframe]
     
 def parse_config(config_data):
     """ 
@@ -49,4 +66,86 @@ def parse_config(config_data):
     credentials = config_data['credentials']
     trade_params = config_data['trade_params']
     strategy_params = config_data['strategy_params']
-    return credentials, trade_params, strategy_params
\ No newline at end of file
+    return credentials, trade_params, strategy_params
+
+# Strategy params required by each strategy. Strategies not listed here are not configured via strategy_params
+REQUIRED_STRATEGY_PARAMS = {
+    'RSI': ('rsi_period', 'rsi_lower_thresh', 'rsi_upper_thresh'),
+    'ADX_RSI_DI': ('rsi_period', 'rsi_lower_thresh', 'rsi_upper_thresh'),
+    'DXI': (),
+    'AROON': (),
+    'AROON_CUSTOM_ENTRY_EXIT': ('up_line_buy_lower_thresh', 'up_line_buy_upper_thresh', 'up_line_exit_thresh',
+                                'down_line_sell_upper_thresh', 'down_line_sell_lower_thresh', 'down_line_exit_thresh'),
+}
+
+def is_number(value):
+    """
+    Check whether config value is a number. Booleans are ints in python but are not accepted as numbers
+    """
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+def validate_config(config_data):
+    """
+    Validate configuration data before it is used by the trading loop
+    args:
+        config_data: Configuration data dictionary
+    returns: None
+    raises:
+        ValueError: If configuration is incomplete or contains invalid values
+    """
+    for section in ('credentials', 'trade_params', 'strategy_params'):
+        if not isinstance(config_data.get(section), dict):
+            raise ValueError(f"Missing configuration section: {section}")
+
+    trade_params = config_data['trade_params']
+    for key in ('symbol', 'lot_size', 'timeframe', 'strategy', 'sleep_interval'):
+        if key not in trade_params:
+            raise ValueError(f"Missing trade param: {key}")
+    if parse_trade_timeframe(trade_params['timeframe']) is None:
+        raise ValueError(f"Unsupported timeframe: {trade_params['timeframe']}")
+    for key in ('lot_size', 'sleep_interval', 'stop_loss_pips_margin', 'take_profit_pips_margin',
+                'signal_deadline_secs', 'max_price_deviation_pips', 'trailing_stop_pips', 'max_holding_minutes', 'max_currency_exposure'):
+        if key in trade_params and (not is_number(trade_params[key]) or trade_params[key] <= 0):
+            raise ValueError(f"Trade param {key} should be a positive number, got: {trade_params[key]}")
+
+    accounts = config_data.get('accounts', [])
+    if not isinstance(accounts, list):
+        raise ValueError("Accounts should be a list of account configurations")
+    for account in accounts:
+        credentials = account.get('credentials') if isinstance(account, dict) else None
+        if not isinstance(credentials, dict) or any(key not in credentials for key in ('login', 'password', 'server', 'mt5_exe_path')):
+            raise ValueError(f"Account should have credentials with login, password, server and mt5_exe_path: {account}")
+        if not is_number(account.get('lot_size')) or account['lot_size'] <= 0:
+            raise ValueError(f"Account {credentials['login']} should have a positive lot_size")
+    if accounts:
+        # Main credentials keep their terminal connected for signals, so accounts can't share it either
+        terminal_paths = [config_data['credentials'].get('mt5_exe_path')] + [account['credentials']['mt5_exe_path'] for account in accounts]
+        if len(set(terminal_paths)) != len(terminal_paths):
+            raise ValueError("Every account needs its own terminal installation i.e. mt5_exe_path distinct from other accounts and credentials")
+
+    strategy_name = trade_params['strategy']
+    if strategy_name not in REQUIRED_STRATEGY_PARAMS:
+        raise ValueError(f"Unknown strategy: {strategy_name}")
+    required_params = REQUIRED_STRATEGY_PARAMS[strategy_name]
+    if not required_params:
+        return
+    strategy_params = config_data['strategy_params'].get(strategy_name)
+    if not isinstance(strategy_params, dict):
+        raise ValueError(f"Missing strategy params for strategy: {strategy_name}")
+    for key in required_params:
+        value = strategy_params.get(key)
+        if not is_number(value):
+            raise ValueError(f"Strategy param {strategy_name}.{key} should be a number, got: {value}")
+        if key.endswith('_thresh') and not 0 <= value <= 100:
+            raise ValueError(f"Strategy param {strategy_name}.{key} should be between 0 and 100, got: {value}")
+
+    if strategy_name in ('RSI', 'ADX_RSI_DI'):
+        if strategy_params['rsi_period'] < 2:
+            raise ValueError(f"Strategy param {strategy_name}.rsi_period should be at least 2")
+        if strategy_params['rsi_lower_thresh'] >= strategy_params['rsi_upper_thresh']:
+            raise ValueError(f"Strategy param {strategy_name}.rsi_lower_thresh should be below rsi_upper_thresh")
+    elif strategy_name == 'AROON_CUSTOM_ENTRY_EXIT':
+        if strategy_params['up_line_buy_lower_thresh'] > strategy_params['up_line_buy_upper_thresh']:
+            raise ValueError("Strategy param up_line_buy_lower_thresh should not exceed up_line_buy_upper_thresh")
+        if strategy_params['down_line_sell_lower_thresh'] > strategy_params['down_line_sell_upper_thresh']:
+            raise ValueError("Strategy param down_line_sell_lower_thresh should not exceed down_line_sell_upper_thresh")
@@ -0,0 +1,276 @@
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from sim_terminal import SimTerminal
+from terminal import use_terminal
+
+logger = logging.getLogger(__name__)
+
+# Strategies fetch up to this many bars, so windows start only once this many bars are available
+WARMUP_BARS = 100
+
+# Terminal of worker process, see init_worker
+history_terminal = None
+
+
+class HistoryTerminal(SimTerminal):
+    """
+    Stand-in terminal serving local historical bars up to a cursor bar, which strategies see as latest bar.
+    Symbol specifications used for PnL are read from symbol info saved along with bars, see load_symbol_info
+    """
+    def __init__(self):
+        super().__init__()
+        self.bars = {}
+        self.cursor = 0
+
+    def load(self, symbol, timeframe, bars_fpath):
+        key = (symbol, timeframe)
+        if key not in self.bars:
+            self.bars[key] = np.load(bars_fpath, mmap_mode='r')
+        return self.bars[key]
+
+    def copy_rates_from_pos(self, symbol, timeframe, start_pos, count):
+        rates = self.bars.get((symbol, timeframe))
+        if rates is None:
+            return None
+        end = self.cursor + 1 - start_pos
+        return np.array(rates[max(end - count, 0):max(end, 0)])
+
+
+def bars_path(bars_dir, symbol, trade_timeframe):
+    return os.path.join(bars_dir, f"{symbol}_{trade_timeframe}.npy")
+
+def symbol_info_path(bars_dir, symbol):
+    return os.path.join(bars_dir, f"{symbol}.json")
+
+def load_symbol_info(bars_dir, symbol):
+    """
+    Symbol specification saved by download_bars
+    returns:
+        Dict of point and digits of symbol
+    raises:
+        RuntimeError: If no symbol info was saved for symbol
+    """
+    fpath = symbol_info_path(bars_dir, symbol)
+    if not os.path.exists(fpath):
+        raise RuntimeError(f"No symbol info for {symbol} in {bars_dir}, download bars again using --download")
+    with open(fpath, 'r') as f:
+        return json.load(f)
+
+def download_bars(config_data, bars_dir, n_bars):
+    """
+    Fetch latest bars of configured symbol and timeframe from terminal and save them to bars directory along with
+    symbol specification, which PnL in points depends on
+    """
+    import MetaTrader5 as mt5
+    from utils import parse_trade_timeframe
+    from mt5_interface import initialize_mt5
+
+    trade_params = config_data['trade_params']
+    if not initialize_mt5(config_data['credentials']):
+        raise RuntimeError(f"Terminal initialization failed: {mt5.last_error()}")
+    rates = mt5.copy_rates_from_pos(trade_params['symbol'], parse_trade_timeframe(trade_params['timeframe']), 0, n_bars)
+    if rates is None:
+        raise RuntimeError(f"Got no rates for {trade_params['symbol']}: {mt5.last_error()}")
+    symbol_info = mt5.symbol_info(trade_params['symbol'])
+    if symbol_info is None:
+        raise RuntimeError(f"Got no symbol info for {trade_params['symbol']}: {mt5.last_error()}")
+    os.makedirs(bars_dir, exist_ok=True)
+    with open(symbol_info_path(bars_dir, trade_params['symbol']), 'w') as f:
+        json.dump({'point': symbol_info.point, 'digits': symbol_info.digits}, f)
+    fpath = bars_path(bars_dir, trade_params['symbol'], trade_params['timeframe'])
+    np.save(fpath, rates)
+    logger.info(f"Saved {len(rates)} bars to {fpath}")
+
+def make_windows(n_bars, train_bars, test_bars, step_bars):
+    """
+    Rolling train/test windows over bars
+    returns:
+        List of (train start, test start, test end) bar indices
+    """
+    windows = []
+    start = WARMUP_BARS
+    while start + train_bars + test_bars <= n_bars:
+        windows.append((start, start + train_bars, start + train_bars + test_bars))
+        start += step_bars
+    return windows
+
+def init_worker():
+    """
+    Route strategy terminal calls of worker process to historical bars and silence per-bar strategy output
+    """
+    global history_terminal
+    history_terminal = HistoryTerminal()
+    use_terminal(history_terminal)
+    logging.basicConfig(level=logging.WARNING)
+    logging.getLogger().setLevel(logging.WARNING)
+    sys.stdout = open(os.devnull, 'w')
+
+def next_signal(strategy_name, symbol, timeframe, strategy_params, state):
+    """
+    Signal of strategy for latest bar, computed by the same strategy functions and params the bot loops use
+    args:
+        state: Indicator values carried over from previous bar or None
+    returns:
+        state: Indicator values for next bar
+        signal: Signal or None
+    """
+    from strategy import RSI_strategy_mean, ADX_RSI_strategy, DXI_strategy, Aroon_strategy, Aroon_custom_threshold_based_exit_strategy
+
+    if strategy_name == 'RSI':
+        params = strategy_params['RSI']
+        return RSI_strategy_mean(symbol, timeframe, params['rsi_period'], params['rsi_upper_thresh'], params['rsi_lower_thresh'], state)
+    elif strategy_name == 'ADX_RSI_DI':
+        params = strategy_params['ADX_RSI_DI']
+        return ADX_RSI_strategy(symbol, timeframe, params['rsi_period'], params['rsi_upper_thresh'], params['rsi_lower_thresh'], state)
+    elif strategy_name == 'DXI':
+        prev_pos_di_val, prev_neg_di_val, signal = DXI_strategy(symbol, timeframe, *(state or (None, None)))
+        return (prev_pos_di_val, prev_neg_di_val), signal
+    elif strategy_name == 'AROON':
+        prev_ar_up_val, prev_ar_down_val, signal = Aroon_strategy(symbol, timeframe, *(state or (None, None)))
+        return (prev_ar_up_val, prev_ar_down_val), signal
+    elif strategy_name == 'AROON_CUSTOM_ENTRY_EXIT':
+        params = strategy_params['AROON_CUSTOM_ENTRY_EXIT']
+        prev_ar_up_val, prev_ar_down_val, signal = Aroon_custom_threshold_based_exit_strategy(
+            symbol, timeframe, *(state or (None, None)),
+            up_line_buy_lower_thresh=params['up_line_buy_lower_thresh'],
+            up_line_buy_upper_thresh=params['up_line_buy_upper_thresh'],
+            down_line_sell_upper_thresh=params['down_line_sell_upper_thresh'],
+            down_line_sell_lower_thresh=params['down_line_sell_lower_thresh'])
+        return (prev_ar_up_val, prev_ar_down_val), signal
+    raise ValueError(f"Unsupported strategy: {strategy_name}")
+
+def backtest_segment(config_name, trade_params, strategy_params, bars_fpath, point, start, end):
+    """
+    Run strategy over bars [start, end) of worker's historical terminal. Orders are filled at signal price with
+    SL/TP margins of trade params, as placed by order_manager.place_order. Stops are checked against highs/lows
+    of following bars, stop loss first when both are hit in the same bar. Positions still open at end of segment
+    are closed at last close.
+    args:
+        point: Point size of symbol as saved along with bars
+    returns:
+        Config name, start, end, no. of trades, PnL in points, no. of winning trades and max drawdown in points
+    """
+    from utils import parse_trade_timeframe
+
+    symbol = trade_params['symbol']
+    timeframe = parse_trade_timeframe(trade_params['timeframe'])
+    rates = history_terminal.load(symbol, timeframe, bars_fpath)
+    multiplier = 10 ** 2 if symbol in ['BTCUSDm', 'ETHUSDm'] else 1
+    sl_distance = trade_params.get('stop_loss_pips_margin', 50) * point * multiplier
+    tp_distance = trade_params.get('take_profit_pips_margin', 25) * point * multiplier
+
+    # Open positions as rows of direction, open price, stop loss, take profit
+    positions = np.zeros((0, 4))
+    trade_pnls = []
+    state = None
+    for cursor in range(start, end):
+        history_terminal.cursor = cursor
+        high, low = rates['high'][cursor], rates['low'][cursor]
+        if len(positions):
+            is_buy = positions[:, 0] > 0
+            sl_hit = np.where(is_buy, low <= positions[:, 2], high >= positions[:, 2])
+            tp_hit = ~sl_hit & np.where(is_buy, high >= positions[:, 3], low <= positions[:, 3])
+            exit_prices = np.where(sl_hit, positions[:, 2], positions[:, 3])
+            closed = sl_hit | tp_hit
+            trade_pnls.extend((positions[closed, 0] * (exit_prices[closed] - positions[closed, 1]) / point).tolist())
+            positions = positions[~closed]
+        state, signal = next_signal(trade_params['strategy'], symbol, timeframe, strategy_params, state)
+        if signal is not None:
+            direction = 1 if signal.order_type == history_terminal.ORDER_TYPE_BUY else -1
+            positions = np.vstack([positions, [direction, signal.price, signal.price - direction * sl_distance,
+                                               signal.price + direction * tp_distance]])
+    if len(positions):
+        trade_pnls.extend((positions[:, 0] * (rates['close'][end - 1] - positions[:, 1]) / point).tolist())
+
+    trade_pnls = np.array(trade_pnls)
+    equity = np.cumsum(trade_pnls)
+    max_drawdown = float((np.maximum.accumulate(np.concatenate([[0.0], equity])) - np.concatenate([[0.0], equity])).max())
+    return config_name, start, end, len(trade_pnls), float(trade_pnls.sum()), int((trade_pnls > 0).sum()), max_drawdown
+
+def run_walk_forward(configs, bars_dir, train_bars, test_bars, step_bars, n_workers):
+    """
+    Evaluate every config on train and test segments of all its windows in parallel
+    args:
+        configs: Dict of config name to configuration data
+    returns:
+        Dict of config name to list of (window, train result, test result)
+    """
+    jobs = []
+    windows_by_config = {}
+    for config_name, config_data in configs.items():
+        trade_params = config_data['trade_params']
+        fpath = bars_path(bars_dir, trade_params['symbol'], trade_params['timeframe'])
+        n_bars = len(np.load(fpath, mmap_mode='r'))
+        point = load_symbol_info(bars_dir, trade_params['symbol'])['point']
+        windows = windows_by_config[config_name] = make_windows(n_bars, train_bars, test_bars, step_bars)
+        if not windows:
+            logger.warning(f"{config_name}: {n_bars} bars in {fpath} are not enough for a single window")
+        for train_start, test_start, test_end in windows:
+            for start, end in ((train_start, test_start), (test_start, test_end)):
+                jobs.append((config_name, trade_params, config_data['strategy_params'], fpath, point, start, end))
+
+    results = {}
+    # Train and test segment of every window are separate jobs so that runtime scales with no. of workers
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=n_workers, mp_context=context, initializer=init_worker) as executor:
+        futures = [executor.submit(backtest_segment, *job) for job in jobs]
+        for future in futures:
+            config_name, start, end, *metrics = future.result()
+            results[(config_name, start, end)] = metrics
+    return {config_name: [(window, results[(config_name, window[0], window[1])], results[(config_name, window[1], window[2])])
+                          for window in windows]
+            for config_name, windows in windows_by_config.items()}
+
+def print_report(report, configs, train_bars, test_bars):
+    for config_name, windows in report.items():
+        trade_params = configs[config_name]['trade_params']
+        print(f"\n{config_name}: {trade_params['symbol']} {trade_params['timeframe']} {trade_params['strategy']}")
+        print(f"{'window':>6} {'train trades':>12} {'train pnl':>10} {'test trades':>11} {'test pnl':>10} {'test win %':>10} {'test max dd':>11}")
+        for index, (_, train, test) in enumerate(windows):
+            win_rate = test[2] / test[0] * 100 if test[0] else 0.0
+            print(f"{index:>6} {train[0]:>12} {train[1]:>10.1f} {test[0]:>11} {test[1]:>10.1f} {win_rate:>10.1f} {test[3]:>11.1f}")
+        if not windows:
+            continue
+        train_pnls = np.array([train[1] for _, train, _ in windows])
+        test_pnls = np.array([test[1] for _, _, test in windows])
+        # Walk forward efficiency: out-of-sample PnL per bar relative to in-sample PnL per bar
+        train_per_bar = train_pnls.mean() / train_bars
+        efficiency = test_pnls.mean() / test_bars / train_per_bar if train_per_bar > 0 else float('nan')
+        print(f"Out-of-sample: profitable windows: {(test_pnls > 0).mean() * 100:.0f}%, mean pnl: {test_pnls.mean():.1f} points, "
+              f"std: {test_pnls.std():.1f} points, walk forward efficiency: {efficiency:.2f}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='[%(asctime)s] %(levelname)s - %(message)s', datefmt='%H:%M:%S')
+    parser = argparse.ArgumentParser(description='Walk forward evaluation of configuration files on local historical bars')
+    parser.add_argument('config_files', nargs='+', help='Configuration files to evaluate e.g. config/*.json')
+    parser.add_argument('--bars-dir', default='bars', help='Directory of historical bars saved as <symbol>_<timeframe>.npy')
+    parser.add_argument('--download', type=int, metavar='N_BARS', help='Download latest N bars of every config from terminal before evaluating')
+    parser.add_argument('--train-bars', type=int, default=5000, help='No. of bars in every train window')
+    parser.add_argument('--test-bars', type=int, default=1000, help='No. of bars in every test window')
+    parser.add_argument('--step-bars', type=int, help='No. of bars windows roll forward by, defaults to test bars')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='No. of worker processes')
+    args = parser.parse_args()
+
+    if not args.download:
+        # Evaluation runs offline, stand-in terminal provides MetaTrader5 constants
+        use_terminal(SimTerminal())
+    from utils import read_config, validate_config
+    configs = {os.path.basename(config_file): read_config(config_file) for config_file in args.config_files}
+    for config_name, config_data in configs.items():
+        validate_config(config_data)
+        if args.download:
+            download_bars(config_data, args.bars_dir, args.download)
+
+    start_time = time.perf_counter()
+    report = run_walk_forward(configs, args.bars_dir, args.train_bars, args.test_bars, args.step_bars or args.test_bars, args.workers)
+    print_report(report, configs, args.train_bars, args.test_bars)
+    print(f"\nEvaluated {sum(len(windows) for windows in report.values())} windows with {args.workers} workers "
+          f"in {time.perf_counter() - start_time:.1f}s")